@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+
+# Add all necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, 'src')
+config_dir = os.path.join(current_dir, 'config')
+
+sys.path.insert(0, src_dir)
+sys.path.insert(0, config_dir)
+
+from display_config import BENCHMARK_BASELINE, BENCHMARK_TOLERANCE, BENCHMARK_MIN_TIME
+from display_config import IMAGE_RESIZE_BACKEND, LANDSCAPE
+
+# Suites register themselves here in definition order
+SUITES = []
+
+def suite(func):
+    SUITES.append(func)
+    return func
+
+def measure(run, min_time=BENCHMARK_MIN_TIME, min_runs=3, max_runs=200):
+    """Fastest seconds per call of run(), after one warm-up call
+
+    The minimum is the least disturbed by other load on the machine.
+    """
+    run()
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_runs or (time.perf_counter() - started < min_time and len(times) < max_runs):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+class CountingBus:
+    """Panel bus that only counts what it is sent
+
+    The display cases time the driver's own work (diffing, windowing,
+    packing); decoding into SimulatedBus's framebuffer would swamp it.
+    """
+
+    max_transfer = 4096
+    state_key = None
+
+    def __init__(self):
+        self.bytes_sent = 0
+        self.transactions = 0
+
+    def set_dc(self, level):
+        pass
+
+    def set_cs(self, level):
+        pass
+
+    def set_rst(self, level):
+        pass
+
+    def write(self, data):
+        self.bytes_sent += memoryview(data).nbytes
+        self.transactions += 1
+
+    def delay(self, seconds):
+        pass
+
+    def close(self):
+        pass
+
+# ---- suites ----
+# Each suite yields (case name, callable, calls per run); setup happens
+# before the yield and is not timed.
+
+@suite
+def rgb565_suite():
+    from PIL import Image
+    from rgb565 import RGB565Converter, pack_rgb565
+
+    rng = np.random.default_rng(0)
+    source = Image.fromarray(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8), 'RGB')
+    for width, height in ((160, 120), (320, 240), (480, 320)):
+        converter = RGB565Converter(width, height, resize=IMAGE_RESIZE_BACKEND)
+        out = converter.new_buffer()
+        yield f"rgb565/convert_{width}x{height}", lambda c=converter, o=out: c.convert(source, o), 1
+
+        pixels = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        yield f"rgb565/pack_{width}x{height}", lambda p=pixels, o=out: pack_rgb565(p, o), 1
+
+@suite
+def gif_suite():
+    import gif_handler
+    # Measure decoding, not the frame cache
+    gif_handler.FRAME_CACHE_ENABLED = False
+
+    gif_dir = os.path.join(current_dir, 'assets', 'gifs')
+    for name in sorted(os.listdir(gif_dir)):
+        path = os.path.join(gif_dir, name)
+
+        def load(path=path):
+            handler = gif_handler.GIFHandler(path, 320, 240, LANDSCAPE)
+            handler.cleanup()
+        yield f"gif/load_{name}", load, 1
+
+@suite
+def image_suite():
+    import image_handler
+    image_handler.FRAME_CACHE_ENABLED = False
+
+    image_dir = os.path.join(current_dir, 'assets', 'images')
+    for name in sorted(os.listdir(image_dir)):
+        path = os.path.join(image_dir, name)
+        yield f"image/load_{name}", lambda path=path: image_handler.ImageHandler(path, 320, 240, LANDSCAPE), 1
+
+@suite
+def text_suite():
+    from text_handler import TextHandler
+
+    # Synthetic log: 200k lines of mixed length, some wrapping
+    rng = np.random.default_rng(0)
+    words = ['sensor', 'value', 'ok', 'timeout', 'retrying', 'connected', '192.168.1.20', 'temperature=21.5C']
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        for i in range(200000):
+            count = int(rng.integers(1, 16))
+            f.write(f"{i:06d} " + ' '.join(words[j] for j in rng.integers(0, len(words), count)) + '\n')
+        path = f.name
+    try:
+        yield "text/index_200k_lines", lambda: TextHandler(path, 320, 240).cleanup(), 1
+
+        def paginate():
+            handler = TextHandler(path, 320, 240)
+            handler.get_frame_count()
+            handler.cleanup()
+        yield "text/paginate_200k_lines", paginate, 1
+
+        handler = TextHandler(path, 320, 240)
+        middle = handler.get_frame_count() // 2
+        yield "text/render_page", lambda: handler._render(middle), 1
+        handler.cleanup()
+    finally:
+        os.unlink(path)
+
+@suite
+def console_suite():
+    from display_output import DualOutput
+
+    output = DualOutput(rotation='landscape', backend='sim')
+    output.display.bus = CountingBus()
+    counter = iter(range(10 ** 9))
+    yield "console/display_print", lambda: output.display_print(f"\nReading {next(counter)}: 21.5C"), 1
+
+    def burst():
+        for i in range(50):
+            output._add_to_display(f"line {i}", update=False)
+        output._update_display()
+    yield "console/burst_50_lines", burst, 1
+    output.cleanup()
+
+@suite
+def display_suite():
+    from display_driver import ILI9341
+
+    display = ILI9341(LANDSCAPE, bus=CountingBus())
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (display.height, display.width, 2), dtype=np.uint8) for _ in range(2)]
+    flip = iter(range(10 ** 9))
+    yield "display/full_frame", lambda: display.display_image(frames[next(flip) % 2]), 1
+
+    def field():
+        i = next(flip)
+        display.display_field(frames[(i >> 1) % 2], i % 2)
+    yield "display/interlaced_field", field, 1
+
+    # Only a 32x32 block changes between frames
+    base = frames[0].copy()
+    patched = base.copy()
+    patched[100:132, 140:172] ^= 0xFF
+    yield "display/partial_32x32", lambda: display.display_image((base, patched)[next(flip) % 2]), 1
+    yield "display/unchanged", lambda: display.display_image(base), 1
+
+    # One step of each transition (drawing and sending)
+    from transitions import Transitions, TRANSITION_STYLES
+    old = frames[0].view('>u2').reshape(display.height, display.width)
+    new = frames[1].view('>u2').reshape(display.height, display.width)
+    for style in TRANSITION_STYLES:
+        transitions = Transitions(display, style)
+
+        def step(t=transitions, style=style):
+            i = next(flip)
+            if style in ('wipe', 'dissolve'):
+                # Start from the old frame again (a cheap reset for these)
+                t._prepare(style, old, new)
+            t._draw(style, 0.25 + 0.5 * (i % 2), new)
+        transitions._prepare(style, old, new)
+        yield f"transition/{style}_step", step, 1
+
+# ---- baseline comparison ----
+
+def run_suites(selected, min_time):
+    results = {}
+    for make_cases in SUITES:
+        cases = make_cases()
+        while True:
+            # Handler progress messages would swamp the table
+            with contextlib.redirect_stdout(io.StringIO()):
+                try:
+                    name, run, calls = next(cases)
+                except StopIteration:
+                    break
+                if selected and not any(s in name for s in selected):
+                    continue
+                seconds = measure(run, min_time) / calls
+            results[name] = seconds
+            print(f"  {name:<32} {seconds * 1000:10.3f} ms")
+    return results
+
+def compare(results, baseline, tolerance):
+    """Print a comparison table; returns the names of regressed cases"""
+    regressions = []
+    print(f"\n{'case':<34} {'baseline ms':>12} {'now ms':>10} {'change':>8}")
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<34} {'-':>12} {seconds * 1000:10.3f}      new")
+            continue
+        change = seconds / before - 1
+        flag = ''
+        if change > tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<34} {before * 1000:12.3f} {seconds * 1000:10.3f} {change:+7.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths without hardware and check for regressions')
+    parser.add_argument('filters', nargs='*', help='Only run cases whose name contains one of these')
+    parser.add_argument('--baseline', default=os.path.join(current_dir, BENCHMARK_BASELINE),
+                        help='Baseline results file')
+    parser.add_argument('--save', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=BENCHMARK_TOLERANCE,
+                        help='Allowed slowdown before failing (0.25 = 25%%)')
+    parser.add_argument('--min-time', type=float, default=BENCHMARK_MIN_TIME,
+                        help='Seconds to repeat each case for')
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help='Succeed without a baseline to compare against (first runs)')
+    args = parser.parse_args()
+
+    # Keep handler console output off any real panel
+    from display_output import init_output
+    init_output(backend='sim').pause_display()
+
+    print(f"Running benchmarks ({platform.machine()}, Python {platform.python_version()})")
+    results = run_suites(args.filters, args.min_time)
+
+    if args.save:
+        baseline = {}
+        if args.filters and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)['cases']
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': platform.machine(), 'python': platform.python_version(),
+                       'cases': baseline}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline} - run with --save to create one")
+        if not args.allow_missing_baseline:
+            sys.exit(1)
+        return
+    with open(args.baseline) as f:
+        saved = json.load(f)
+    if saved.get('machine') != platform.machine():
+        print(f"⚠️  Baseline was recorded on {saved.get('machine')}, comparing anyway")
+
+    regressions = compare(results, saved['cases'], args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nAll cases within {args.tolerance:.0%} of baseline")
+
+if __name__ == "__main__":
+    main()
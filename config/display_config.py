@@ -10,6 +10,14 @@ SPI_PORT = 0
 SPI_DEVICE = 0
 SPI_SPEED = 32000000
 
+# Panel bus backend: 'spidev' (real hardware) or 'sim' (in-memory framebuffer)
+# Can be overridden with the RPI_DISPLAY_BACKEND environment variable
+DISPLAY_BACKEND = 'spidev'
+
+# Simulated bus cost model (per spidev ioctl and per GPIO.output call)
+SIM_TRANSACTION_OVERHEAD_US = 25
+SIM_GPIO_OVERHEAD_US = 3
+
 # Display dimensions
 WIDTH = 240
 HEIGHT = 320
@@ -22,6 +30,8 @@ ILI9341_COLADDRSET = 0x2A
 ILI9341_PAGEADDRSET = 0x2B
 ILI9341_MEMORYWRITE = 0x2C
 ILI9341_MADCTL = 0x36
+ILI9341_VSCRDEF = 0x33   # Vertical Scrolling Definition
+ILI9341_VSCRSADD = 0x37  # Vertical Scroll Start Address
 
 # Memory Access Control values
 MADCTL_MY = 0x80  # Row Address Order
@@ -50,8 +60,113 @@ PORTRAIT_BOTH = MADCTL_MV | MADCTL_MX | MADCTL_MY | MADCTL_BGR # 0xE8 - Both
 LANDSCAPE = PORTRAIT_FLIPPED    # Try this first for landscape
 PORTRAIT = PORTRAIT_FLIPPED      # Try this first for portrait
 
+# Multiple panels: one dict per display, each with its own pins, rotation and
+# optionally its own content ('source'). Omitted keys use the single-panel
+# settings above. The first panel carries the console. Empty = one panel.
+PANELS = []
+# PANELS = [
+#     {'name': 'left', 'spi_device': 0, 'cs': 8, 'dc': 24, 'rst': 25, 'rotation': LANDSCAPE},
+#     {'name': 'right', 'spi_device': 1, 'cs': 7, 'dc': 23, 'rst': 22, 'rotation': LANDSCAPE},
+# ]
+
+# Partial update (dirty rectangle) settings
+DIRTY_RECT_MERGE_GAP = 16     # Merge changed row bands closer than this many rows
+DIRTY_RECT_MAX_RECTS = 8      # Collapse to a single bounding box above this many rects
+DIRTY_RECT_FULL_RATIO = 0.6   # Send the whole frame when more than this fraction changed
+
+# Interlaced updates: for these file types each frame sends only its even or
+# odd rows (alternating), halving SPI bytes per frame, e.g. ('video', 'gif')
+INTERLACE_FILE_TYPES = ()
+
+# Transitions between content (playlist switches, and after the loading screen)
+TRANSITION_STYLE = 'crossfade'  # 'crossfade', 'wipe', 'slide', 'dissolve' or None for a cut
+TRANSITION_DURATION = 0.25  # Seconds; slower hardware draws fewer steps, not longer ones
+TRANSITION_MIN_STEPS = 4  # Styles too slow for this many steps in the budget fall back to wipe
+TRANSITION_MAX_FPS = 30  # Step rate cap, so fast hosts do not redraw needlessly
+
+# Resize backend per content type: 'cv2_area', 'cv2_nearest' or 'pil_lanczos'
+GIF_RESIZE_BACKEND = 'pil_lanczos'
+IMAGE_RESIZE_BACKEND = 'pil_lanczos'
+VIDEO_RESIZE_BACKEND = 'cv2_area'
+
+# Large image decoding (ImageHandler)
+IMAGE_DRAFT = True  # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding
+IMAGE_RESAMPLE = 'lanczos'  # Final PIL filter: 'nearest', 'bilinear', 'bicubic' or 'lanczos' (slowest, sharpest)
+IMAGE_REDUCING_GAP = 2.0  # Box-reduce by an integer factor first (None = resample from full size)
+
+# Video decode worker processes (0 = decode inline in the playback process)
+# Workers fill a shared-memory ring of ready RGB565 frames; with more than one,
+# each decodes every Nth segment of VIDEO_SEGMENT_FRAMES frames and the ring grows to
+# workers * VIDEO_SEGMENT_FRAMES + VIDEO_RING_SLOTS frames (about 16 MB at 320x240 for 2)
+VIDEO_DECODE_WORKERS = 0
+VIDEO_RING_SLOTS = 8
+VIDEO_SEGMENT_FRAMES = 48
+
+# Converted frame cache (memory-mapped RGB565, keyed by file content)
+FRAME_CACHE_ENABLED = True
+FRAME_CACHE_DIR = 'cache/frames'          # Relative to the project root
+FRAME_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Least recently used entries are evicted
+
+# GIF memory budget: GIFs whose converted frames exceed this are streamed
+# (decoded lazily into a ring of GIF_STREAM_AHEAD frames) instead of held in RAM
+GIF_MEMORY_BUDGET = 32 * 1024 * 1024
+GIF_STREAM_AHEAD = 4
+
+# Where resident GIF frames live after loading:
+#   'mapped'  - memory-mapped frame cache entry (instant start, page cache)
+#   'compact' - deduplicated, delta/RLE compressed frames in RAM (smallest RSS,
+#               lets several animations stay loaded at once)
+GIF_FRAME_STORAGE = 'mapped'
+FRAME_STORE_KEYFRAME_INTERVAL = 30  # Max deltas replayed for random access
+
+# Text paging settings
+TEXT_PAGE_CACHE_PAGES = 8  # Rendered pages kept in memory
+TEXT_PAGE_DURATION = 5000  # Milliseconds per page
+TEXT_FOLLOW_MAX_FPS = 4  # Refresh cap when following a growing file
+TEXT_FOLLOW_POLL_INTERVAL = 0.5  # Seconds between stat polls without inotify
+TEXT_FOLLOW_TAIL_BYTES = 64 * 1024  # Read at most this much of a file's end
+
+# Metrics settings
+METRICS_ENABLED = False  # Per-stage timing (also enabled by --metrics)
+METRICS_WINDOW = 1024  # Samples kept per stage for percentiles
+METRICS_INTERVAL = 10  # Seconds between exports
+
+# Benchmark settings (benchmark.py)
+BENCHMARK_BASELINE = 'benchmark_baseline.json'  # Relative to the project root
+BENCHMARK_TOLERANCE = 0.25  # Fail when a case is this much slower than its baseline
+BENCHMARK_MIN_TIME = 0.5  # Seconds each case is repeated for (at least 3 runs)
+
+# Startup settings
+PANEL_STATE_PATH = '/run/rpi-display-panel.json'  # Lets --fast-start skip panel reset this boot (root-only dir)
+
+# Display server settings
+DISPLAY_SOCKET_PATH = '/run/rpi-display/display.sock'  # In a private directory; override with $RPI_DISPLAY_SOCKET
+DISPLAY_SOCKET_MODE = 0o660  # Only root and DISPLAY_SOCKET_GROUP may connect
+DISPLAY_SOCKET_GROUP = 'spi'  # Users allowed to draw; must exist (None = root only)
+DISPLAY_SHM_DIR = '/dev/shm'  # Where clients place shared frame buffers
+
+# Playlist settings
+PLAYLIST_DEFAULT_DURATION = 10  # Seconds per item when a playlist gives no duration/loops
+
 # Font settings
 FONT_SIZE = 12
 FONT_SCALE = 1
 TEXT_COLOR = (255, 255, 255)  # White
-BACKGROUND_COLOR = (0, 0, 0)   # Black
\ No newline at end of file
+BACKGROUND_COLOR = (0, 0, 0)   # Black
+STATUS_BAR_COLOR = (0, 0, 0)
+STATUS_BAR_BACKGROUND = (255, 200, 0)  # Amber
+
+# Split-screen layout (--layout): named regions of the panel, each with its own
+# source and update rate (per second). Sources: 'media' (the file being played,
+# rendered at the region's size), 'console' (display_print output) and 'status'
+# (clock, FPS and file name). Coordinates are for the 320x240 orientation.
+LAYOUT_REGIONS = [
+    {'name': 'status', 'source': 'status', 'x': 0, 'y': 0, 'width': 320, 'height': 16, 'rate': 2},
+    {'name': 'media', 'source': 'media', 'x': 0, 'y': 16, 'width': 320, 'height': 176},
+    {'name': 'console', 'source': 'console', 'x': 0, 'y': 192, 'width': 320, 'height': 48, 'rate': 4},
+]
+CONSOLE_MONO_GLYPHS = False    # 1-bit (non-antialiased) console glyphs
+CONSOLE_HW_SCROLL = True       # Scroll the console in hardware - only rotations without MV, so
+                               # not the default PORTRAIT_FLIPPED (0xA8), which redraws full frames
+CONSOLE_SCROLL_TOP = 5         # Fixed rows above the scrolling console
+CONSOLE_SCROLL_BOTTOM = 0      # Minimum fixed rows below it
@@ -12,11 +12,9 @@ sys.path.insert(0, current_dir)
 sys.path.insert(0, src_dir)
 sys.path.insert(0, config_dir)
 
-# Now import and run
+# Now import and run (handlers and their heavy imports load on demand)
 try:
-    from src.display_driver import ILI9341, PORTRAIT, LANDSCAPE
-    from src.file_dispatcher import FileDispatcher
-    from src.main import main
+    from main import main
     
     # Pass command line arguments to main
     if __name__ == "__main__":
@@ -30,8 +28,6 @@ except ImportError as e:
     os.chdir('src')
     sys.path.insert(0, '.')
     
-    from display_driver import ILI9341, PORTRAIT, LANDSCAPE
-    from file_dispatcher import FileDispatcher
     from main import main
     
     if __name__ == "__main__":
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+# Add all necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, 'src')
+config_dir = os.path.join(current_dir, 'config')
+
+sys.path.insert(0, src_dir)
+sys.path.insert(0, config_dir)
+
+from display_server import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import numpy as np
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import TEXT_COLOR, BACKGROUND_COLOR, STATUS_BAR_COLOR, STATUS_BAR_BACKGROUND
+
+class Region:
+    """A named rectangle of the panel, pushed with a window of exactly its size
+
+    Also has the FrameSender interface (submit/flush/close), so play_frames
+    can drive a media region directly with frames rendered at its size.
+    """
+
+    interlace = False
+
+    def __init__(self, display, name, x, y, width, height):
+        if x < 0 or y < 0 or x + width > display.width or y + height > display.height:
+            raise ValueError(f"Region '{name}' ({x},{y} {width}x{height}) is outside the "
+                             f"{display.width}x{display.height} panel")
+        self.display = display
+        self.name = name
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.buffer = np.zeros((height, width, 2), dtype=np.uint8)
+        self.updates = 0
+
+    def push(self, pixels=None):
+        """Send the region's buffer (or a region-sized RGB565 frame) to the panel"""
+        self.display.write_region(self.x, self.y, self.x + self.width - 1, self.y + self.height - 1,
+                                  self.buffer if pixels is None else pixels)
+        self.updates += 1
+
+    def submit(self, frame):
+        self.push(np.frombuffer(memoryview(frame).cast('B'), dtype=np.uint8))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class TextRegion(Region):
+    """Region showing the lines returned by a callable, redrawn only when they change"""
+
+    def __init__(self, display, name, x, y, width, height, atlas, lines, rate,
+                 fg=TEXT_COLOR, bg=BACKGROUND_COLOR, margin=2):
+        super().__init__(display, name, x, y, width, height)
+        self.atlas = atlas
+        self.lines = lines
+        self.rate = rate
+        self.fg = fg
+        self.bg = bg
+        self.margin = margin
+        self.rows = max(atlas.rows(height - margin), 1)
+        self._shown = None
+
+    def update(self):
+        """Redraw and push if the text changed; returns whether anything was sent"""
+        lines = self.lines()[-self.rows:]
+        if lines == self._shown:
+            return False
+        self.atlas.fill(self.buffer, self.bg)
+        self.atlas.draw_lines(self.buffer, lines, self.margin, self.margin, self.fg, self.bg)
+        self.push()
+        self._shown = lines
+        return True
+
+class Compositor:
+    """Splits the panel into named regions that update independently
+
+    Text regions (console, status bar) are redrawn on their own thread at
+    their own rate, and only when their text changed; media regions are
+    driven by the playback loop at the content's frame rate. Each update
+    is a write_region of just that rectangle, so a 2 Hz status bar never
+    resends the video area and video frames never resend the status bar.
+    The driver lock keeps writes from different regions apart.
+    """
+
+    def __init__(self, display):
+        self.display = display
+        self.regions = {}
+        self._atlas = None
+        self._text_lock = threading.Lock()  # Text regions share one GlyphAtlas
+        self._stop = threading.Event()
+        self._threads = []
+
+        # Known starting point: a blank screen outside the regions
+        display.display_image(np.zeros((display.height, display.width, 2), dtype=np.uint8), full=True)
+
+    def _glyphs(self):
+        if self._atlas is None:
+            from glyph_atlas import GlyphAtlas, load_mono_font
+            self._atlas = GlyphAtlas(load_mono_font())
+        return self._atlas
+
+    def add_media(self, name, x, y, width, height):
+        """Region for frames from a FileDispatcher created at (width, height)"""
+        region = self.regions[name] = Region(self.display, name, x, y, width, height)
+        return region
+
+    def add_text(self, name, x, y, width, height, lines, rate, **style):
+        """Region showing lines() - a list of strings - checked rate times per second"""
+        region = self.regions[name] = TextRegion(self.display, name, x, y, width, height,
+                                                 self._glyphs(), lines, rate, **style)
+        return region
+
+    def add_status(self, name, x, y, width, height, text, rate):
+        """One-line status bar showing text() in the status colours"""
+        return self.add_text(name, x, y, width, height, lambda: [text()], rate,
+                             fg=STATUS_BAR_COLOR, bg=STATUS_BAR_BACKGROUND)
+
+    def start(self):
+        """Start one update thread per text region"""
+        self._stop.clear()
+        for region in self.regions.values():
+            if isinstance(region, TextRegion):
+                thread = threading.Thread(target=self._run, args=(region,),
+                                          name=f"region-{region.name}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self, region):
+        interval = 1.0 / region.rate
+        while not self._stop.is_set():
+            try:
+                with self._text_lock:
+                    region.update()
+            except Exception as e:
+                print(f"❌ Region '{region.name}' update error: {e}")
+            self._stop.wait(interval)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    def report(self):
+        return ', '.join(f"{name}: {region.updates}" for name, region in self.regions.items())
@@ -0,0 +1,341 @@
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import *
+
+SPIDEV_BUFSIZ_PATH = '/sys/module/spidev/parameters/bufsiz'
+SPIDEV_DEFAULT_BUFSIZ = 4096
+
+def detect_spi_bufsiz():
+    """Return the kernel spidev transfer size limit (bytes per write)"""
+    try:
+        with open(SPIDEV_BUFSIZ_PATH) as f:
+            return max(int(f.read().strip()), 1)
+    except (OSError, ValueError):
+        return SPIDEV_DEFAULT_BUFSIZ
+
+# Panels on one SPI port share MOSI/SCLK: only one may have CS low at a time
+_port_locks = {}
+_port_locks_guard = threading.Lock()
+
+def _port_lock(port):
+    with _port_locks_guard:
+        return _port_locks.setdefault(port, threading.Lock())
+
+class SpidevBus:
+    """Real panel bus: spidev for the data line, RPi.GPIO for DC/RST/CS
+
+    Selecting the panel (CS low) takes a lock shared by every bus on the
+    same SPI port, released when CS goes high again, so panels on one
+    port take turns rather than interleaving their transfers.
+    """
+
+    def __init__(self, port=SPI_PORT, device=SPI_DEVICE, speed_hz=SPI_SPEED, dc=DC, rst=RST, cs=CS):
+        import spidev
+        import RPi.GPIO as GPIO
+
+        self.GPIO = GPIO
+        # Identifies the panel across runs, for warm re-attach
+        self.state_key = f"spidev{port}.{device}:dc{dc}:rst{rst}:cs{cs}"
+        self.dc_pin = dc
+        self.rst_pin = rst
+        self.cs_pin = cs
+        self._port_lock = _port_lock(port)
+        self._selected = False
+
+        # Initialize GPIO
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+        GPIO.setup(dc, GPIO.OUT)
+        GPIO.setup(rst, GPIO.OUT)
+        GPIO.setup(cs, GPIO.OUT)
+
+        # Set CS high initially
+        GPIO.output(cs, GPIO.HIGH)
+
+        # Initialize SPI with optimized settings
+        self.spi = spidev.SpiDev()
+        try:
+            self.spi.open(port, device)
+            self.spi.max_speed_hz = speed_hz
+            self.spi.mode = 0b00
+            self.spi.lsbfirst = False
+        except Exception as e:
+            print(f"SPI initialization failed: {e}")
+            raise
+
+        # Largest single transfer the spidev driver accepts
+        self.max_transfer = detect_spi_bufsiz()
+        self._zero_copy = hasattr(self.spi, 'writebytes2')
+
+    def set_dc(self, level):
+        self.GPIO.output(self.dc_pin, level)
+
+    def set_cs(self, level):
+        if not level and not self._selected:
+            self._port_lock.acquire()
+            self._selected = True
+        self.GPIO.output(self.cs_pin, level)
+        if level and self._selected:
+            self._selected = False
+            self._port_lock.release()
+
+    def set_rst(self, level):
+        self.GPIO.output(self.rst_pin, level)
+
+    def write(self, data):
+        """Write a buffer-protocol object in bufsiz-sized blocks"""
+        data = memoryview(data).cast('B')
+        chunk_size = self.max_transfer
+
+        if self._zero_copy:
+            # writebytes2 takes any buffer-protocol object directly
+            for i in range(0, len(data), chunk_size):
+                self.spi.writebytes2(data[i:i + chunk_size])
+        else:
+            # Older spidev: only accepts lists of ints
+            for i in range(0, len(data), chunk_size):
+                self.spi.writebytes(data[i:i + chunk_size].tolist())
+
+    def delay(self, seconds):
+        time.sleep(seconds)
+
+    def close(self):
+        try:
+            self.spi.close()
+        except:
+            pass
+        # Only this panel's pins - other panels may still be running
+        self.GPIO.cleanup([self.dc_pin, self.rst_pin, self.cs_pin])
+
+class SimulatedBus:
+    """Hardware-free bus that decodes the ILI9341 command stream into a framebuffer
+
+    Counts bytes, SPI transactions and GPIO writes, and models how long the
+    same traffic would take on a real bus at spi_hz.
+    """
+
+    def __init__(self, spi_hz=SPI_SPEED, transaction_overhead_us=SIM_TRANSACTION_OVERHEAD_US,
+                 gpio_overhead_us=SIM_GPIO_OVERHEAD_US, png_path=None):
+        self.spi_hz = spi_hz
+        self.transaction_overhead = transaction_overhead_us / 1e6
+        self.gpio_overhead = gpio_overhead_us / 1e6
+        self.png_path = png_path
+        self.max_transfer = detect_spi_bufsiz()
+        self.state_key = None  # Fresh panel memory every run - never warm
+
+        # Panel memory in native orientation: 320 rows x 240 columns of RGB565
+        self.gram = np.zeros((320, 240), dtype=np.uint16)
+        self.madctl = 0
+        self.scroll_start = 0
+        self.scroll_area = (0, 320, 0)
+
+        self.dc = 1
+        self.cs = 1
+        self.rst = 1
+        self._command = None
+        self._params = bytearray()
+        self._window = (0, 0, 239, 319)
+        self._cursor = 0
+        self._carry = b''
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero all traffic counters"""
+        self.bytes_sent = 0
+        self.pixel_bytes = 0
+        self.transactions = 0
+        self.gpio_writes = 0
+        self.commands = {}
+        self.delay_time = 0.0
+
+    # ---- bus interface ----
+
+    def set_dc(self, level):
+        self.gpio_writes += 1
+        self.dc = level
+
+    def set_cs(self, level):
+        self.gpio_writes += 1
+        self.cs = level
+
+    def set_rst(self, level):
+        self.gpio_writes += 1
+        if self.rst and not level:
+            # Falling edge on RST: panel returns to power-on defaults
+            self.madctl = 0
+            self.scroll_start = 0
+            self.scroll_area = (0, 320, 0)
+            self._command = None
+        self.rst = level
+
+    def write(self, data):
+        data = memoryview(data).cast('B')
+        length = len(data)
+        self.bytes_sent += length
+        self.transactions += max(1, -(-length // self.max_transfer))
+
+        if self.dc:
+            self._write_data(data)
+        else:
+            for cmd in data.tolist():
+                self._start_command(cmd)
+
+    def delay(self, seconds):
+        # Modeled, not slept - keeps simulated runs fast
+        self.delay_time += seconds
+
+    def close(self):
+        if self.png_path:
+            self.save_png(self.png_path)
+            print(f"Simulated framebuffer saved to {self.png_path}")
+        print(self.report())
+
+    # ---- command decoding ----
+
+    def _start_command(self, cmd):
+        self.commands[cmd] = self.commands.get(cmd, 0) + 1
+        self._command = cmd
+        self._params = bytearray()
+        self._carry = b''
+        if cmd == ILI9341_SOFTRESET:
+            self.madctl = 0
+            self.scroll_start = 0
+        elif cmd == ILI9341_MEMORYWRITE:
+            self._cursor = 0
+
+    def _write_data(self, data):
+        if self._command == ILI9341_MEMORYWRITE:
+            self.pixel_bytes += len(data)
+            self._write_pixels(data)
+            return
+
+        self._params.extend(data)
+        p = self._params
+        if self._command == ILI9341_COLADDRSET and len(p) >= 4:
+            x0, x1 = (p[0] << 8) | p[1], (p[2] << 8) | p[3]
+            self._window = (x0, self._window[1], x1, self._window[3])
+        elif self._command == ILI9341_PAGEADDRSET and len(p) >= 4:
+            y0, y1 = (p[0] << 8) | p[1], (p[2] << 8) | p[3]
+            self._window = (self._window[0], y0, self._window[2], y1)
+        elif self._command == ILI9341_MADCTL and len(p) >= 1:
+            self.madctl = p[0]
+        elif self._command == ILI9341_VSCRDEF and len(p) >= 6:
+            self.scroll_area = ((p[0] << 8) | p[1], (p[2] << 8) | p[3], (p[4] << 8) | p[5])
+        elif self._command == ILI9341_VSCRSADD and len(p) >= 2:
+            self.scroll_start = (p[0] << 8) | p[1]
+
+    def _address_view(self):
+        """Panel memory as the controller addresses it (columns = CASET, rows = PASET)
+
+        Row mirroring (MY) is modelled for unexchanged rotations only, where
+        it decides how hardware scrolling looks on screen.
+        """
+        if self.madctl & MADCTL_MV:
+            return self.gram.T
+        return self.gram[::-1] if self.madctl & MADCTL_MY else self.gram
+
+    def _write_pixels(self, data):
+        if self._carry:
+            data = self._carry + bytes(data)
+            self._carry = b''
+        if len(data) % 2:
+            self._carry = bytes(data[-1:])
+            data = data[:-1]
+        if not len(data):
+            return
+
+        view = self._address_view()
+        x0, y0, x1, y1 = self._window
+        x1 = min(x1, view.shape[1] - 1)
+        y1 = min(y1, view.shape[0] - 1)
+        win_w, win_h = x1 - x0 + 1, y1 - y0 + 1
+        if win_w <= 0 or win_h <= 0:
+            return
+
+        pixels = np.frombuffer(data, dtype='>u2')
+        idx = (self._cursor + np.arange(pixels.size)) % (win_w * win_h)
+        view[y0 + idx // win_w, x0 + idx % win_w] = pixels
+        self._cursor = (self._cursor + pixels.size) % (win_w * win_h)
+
+    # ---- inspection ----
+
+    def modeled_time(self):
+        """Seconds the recorded traffic would take on real hardware"""
+        return (self.bytes_sent * 8 / self.spi_hz
+                + self.transactions * self.transaction_overhead
+                + self.gpio_writes * self.gpio_overhead
+                + self.delay_time)
+
+    def stats(self):
+        return {
+            'bytes': self.bytes_sent,
+            'pixel_bytes': self.pixel_bytes,
+            'transactions': self.transactions,
+            'gpio_writes': self.gpio_writes,
+            'memory_writes': self.commands.get(ILI9341_MEMORYWRITE, 0),
+            'spi_hz': self.spi_hz,
+            'modeled_seconds': self.modeled_time(),
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"[SIM] {s['bytes']} bytes, {s['transactions']} transactions, "
+                f"{s['gpio_writes']} GPIO writes, {s['memory_writes']} memory writes, "
+                f"modeled {s['modeled_seconds'] * 1000:.1f} ms @ {s['spi_hz'] / 1e6:.0f} MHz")
+
+    def framebuffer(self):
+        """Visible RGB565 frame in address orientation, with vertical scroll applied"""
+        gram = self.gram
+        top, height, _ = self.scroll_area
+        if self.scroll_start and height:
+            # Hardware scroll rotates the scroll area along the native 320-line axis
+            gram = gram.copy()
+            area = self.gram[top:top + height]
+            gram[top:top + height] = np.roll(area, -(self.scroll_start - top), axis=0)
+        if self.madctl & MADCTL_MV:
+            return gram.T
+        return gram[::-1] if self.madctl & MADCTL_MY else gram
+
+    def snapshot(self):
+        """Visible frame as an RGB888 array (height, width, 3)"""
+        fb = self.framebuffer()
+        rgb = np.empty(fb.shape + (3,), dtype=np.uint8)
+        rgb[..., 0] = (fb >> 8) & 0xF8
+        rgb[..., 1] = (fb >> 3) & 0xFC
+        rgb[..., 2] = (fb << 3) & 0xF8
+        return rgb
+
+    def save_png(self, path):
+        from PIL import Image
+        Image.fromarray(self.snapshot(), 'RGB').save(path)
+
+def create_bus(backend=None, panel=None):
+    """Create the panel bus named by backend, $RPI_DISPLAY_BACKEND or DISPLAY_BACKEND
+
+    panel is an entry from PANELS; its pins override the single-panel settings.
+    """
+    backend = backend or os.environ.get('RPI_DISPLAY_BACKEND') or DISPLAY_BACKEND
+    panel = panel or {}
+    if backend == 'spidev':
+        return SpidevBus(port=panel.get('spi_port', SPI_PORT), device=panel.get('spi_device', SPI_DEVICE),
+                         speed_hz=panel.get('spi_speed', SPI_SPEED), dc=panel.get('dc', DC),
+                         rst=panel.get('rst', RST), cs=panel.get('cs', CS))
+    if backend == 'sim':
+        spi_hz = int(os.environ.get('RPI_DISPLAY_SPI_HZ', panel.get('spi_speed', SPI_SPEED)))
+        png_path = os.environ.get('RPI_DISPLAY_SIM_PNG')
+        if png_path and 'name' in panel:
+            root, ext = os.path.splitext(png_path)
+            png_path = f"{root}-{panel['name']}{ext}"
+        return SimulatedBus(spi_hz=spi_hz, png_path=png_path)
+    raise ValueError(f"Unknown display backend: {backend}")
@@ -0,0 +1,168 @@
+import atexit
+import json
+import mmap
+import os
+import socket
+import sys
+import tempfile
+import threading
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import DISPLAY_SOCKET_PATH, DISPLAY_SHM_DIR
+
+class DisplayClient:
+    """Talks to a running display server instead of driving the panel itself
+
+    Has the same printf/display_print/dual_print API as DualOutput, plus
+    push_frame() for whole RGB565 frames, which travel through a shared
+    memory file rather than the socket (only its descriptor is passed). Nothing touches SPI or GPIO, so a
+    client starts in milliseconds. When no server is running, display
+    output falls back to the terminal.
+    """
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or os.environ.get('RPI_DISPLAY_SOCKET', DISPLAY_SOCKET_PATH)
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self._warned = False
+        self._frame_fd = None
+        self._frame_map = None
+        self.width = None
+        self.height = None
+
+    def connect(self):
+        """Connect if not already connected; returns False when no server is running"""
+        if self._sock:
+            return True
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.socket_path)
+        except OSError as e:
+            if not self._warned:
+                print(f"⚠️  Display server not available ({e}) - printing to terminal instead")
+                self._warned = True
+            return False
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+        return True
+
+    def _send(self, message, reply=False, fd=None):
+        with self._lock:
+            if not self.connect():
+                return None
+            try:
+                data = json.dumps(message).encode() + b'\n'
+                if fd is not None:
+                    # The descriptor travels with the first part of the message
+                    sent = socket.send_fds(self._sock, [data], [fd])
+                    data = data[sent:]
+                self._sock.sendall(data)
+                if not reply:
+                    return True
+                response = json.loads(self._reader.readline() or b'null')
+            except (OSError, ValueError):
+                self._disconnect()
+                return None
+        if response and not response.get('ok'):
+            raise RuntimeError(f"Display server error: {response.get('error')}")
+        return response
+
+    def _disconnect(self):
+        if self._reader:
+            self._reader.close()
+        if self._sock:
+            self._sock.close()
+        self._sock = self._reader = None
+
+    def printf(self, *args, **kwargs):
+        """Print to terminal only (like regular print)"""
+        print(*args, **kwargs)
+
+    def display_print(self, *args, **kwargs):
+        """Print to TFT display only"""
+        text = ' '.join(str(arg) for arg in args)
+        if self._send({'op': 'print', 'text': text}) is None:
+            print(*args, **kwargs)
+
+    def dual_print(self, *args, **kwargs):
+        """Print to both terminal and TFT display"""
+        print(*args, **kwargs)
+        self._send({'op': 'print', 'text': ' '.join(str(arg) for arg in args)})
+
+    def clear_display(self):
+        self._send({'op': 'clear'})
+
+    def display_size(self):
+        """(width, height) of the server's panel, or None without a server"""
+        if self.width is None:
+            info = self._send({'op': 'info'}, reply=True)
+            if info is None:
+                return None
+            self.width, self.height = info['width'], info['height']
+        return self.width, self.height
+
+    def push_frame(self, frame):
+        """Show a full-screen RGB565 frame (bytes or array of width*height*2 bytes)
+
+        Returns once the server has taken a copy, so the frame may be reused.
+        """
+        size = self.display_size()
+        if size is None:
+            return False
+        data = memoryview(frame).cast('B')
+        if len(data) != size[0] * size[1] * 2:
+            raise ValueError(f"Frame must be {size[0]}x{size[1]} RGB565 ({size[0] * size[1] * 2} bytes)")
+
+        if self._frame_map is None:
+            shm_dir = DISPLAY_SHM_DIR if os.path.isdir(DISPLAY_SHM_DIR) else tempfile.gettempdir()
+            fd, path = tempfile.mkstemp(prefix='rpi-display-', suffix='.frame', dir=shm_dir)
+            # The server reads through the passed descriptor, so the file needs no name
+            os.unlink(path)
+            os.ftruncate(fd, len(data))
+            self._frame_map = mmap.mmap(fd, len(data))
+            self._frame_fd = fd
+        self._frame_map[:] = data
+        return self._send({'op': 'frame'}, reply=True, fd=self._frame_fd) is not None
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+        if self._frame_map is not None:
+            self._frame_map.close()
+            self._frame_map = None
+        if self._frame_fd is not None:
+            os.close(self._frame_fd)
+            self._frame_fd = None
+
+# Global instance
+client = None
+
+def get_client():
+    global client
+    if client is None:
+        client = DisplayClient()
+        atexit.register(client.close)
+    return client
+
+# Convenience functions (drop-in for display_output's)
+def printf(*args, **kwargs):
+    """Print to terminal only"""
+    get_client().printf(*args, **kwargs)
+
+def display_print(*args, **kwargs):
+    """Print to TFT display only"""
+    get_client().display_print(*args, **kwargs)
+
+def dual_print(*args, **kwargs):
+    """Print to both terminal and TFT display"""
+    get_client().dual_print(*args, **kwargs)
+
+def push_frame(frame):
+    """Show a full-screen RGB565 frame"""
+    return get_client().push_frame(frame)
@@ -1,8 +1,9 @@
-import spidev
-import RPi.GPIO as GPIO
-import time
+import json
+import numpy as np
 import os
 import sys
+import threading
+import time
 
 # Add config directory to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,34 +12,49 @@ config_path = os.path.join(parent_dir, 'config')
 sys.path.insert(0, config_path)
 
 from display_config import *
+from display_bus import create_bus
+from metrics import metrics
+
+def _boot_id():
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _read_state():
+    """The saved panel state, or {} - never following a symlink planted at the path"""
+    try:
+        fd = os.open(PANEL_STATE_PATH, os.O_RDONLY | os.O_NOFOLLOW)
+        with os.fdopen(fd) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
 
 class ILI9341:
-    def __init__(self, rotation=PORTRAIT):
+    def __init__(self, rotation=PORTRAIT, bus=None, warm=False):
         self.rotation = rotation
-        self.update_dimensions()
         
-        # Initialize GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)
-        GPIO.setup(DC, GPIO.OUT)
-        GPIO.setup(RST, GPIO.OUT)
-        GPIO.setup(CS, GPIO.OUT)
+        # Shadow copy of panel memory (RGB565 words), None when unknown
+        self._shadow = None
         
-        # Set CS high initially
-        GPIO.output(CS, GPIO.HIGH)
+        # Hardware vertical scroll state: (top fixed, scroll height, bottom fixed) and start line
+        self.scroll_area = (0, HEIGHT, 0)
+        self.scroll_start = 0
+        self.scroll_resets = 0
+        self.update_dimensions()
         
-        # Initialize SPI with optimized settings
-        self.spi = spidev.SpiDev()
-        try:
-            self.spi.open(SPI_PORT, SPI_DEVICE)
-            self.spi.max_speed_hz = 32000000
-            self.spi.mode = 0b00
-            self.spi.lsbfirst = False
-        except Exception as e:
-            print(f"SPI initialization failed: {e}")
-            raise
+        # Serializes drawing between the transmit thread and console output
+        self.lock = threading.RLock()
         
-        self.init_display()
+        # SPI + GPIO transport (real spidev or simulated)
+        self.bus = bus if bus is not None else create_bus()
+        
+        # warm: skip the reset/init sequence if this boot already configured the panel
+        if not (warm and self.attach()):
+            self.init_display()
+            self._save_state()
     
     def update_dimensions(self):
         """Update width and height based on rotation"""
@@ -48,30 +64,46 @@ class ILI9341:
         else:
             self.width = 240
             self.height = 320
+        self.invalidate()
         print(f"Display dimensions: {self.width}x{self.height}")
     
+    def invalidate(self):
+        """Forget the shadow framebuffer so the next frame is sent in full"""
+        self._shadow = None
+    
+    def current_frame(self):
+        """Copy of what the panel shows as (height, width, 2) RGB565 bytes, or None if unknown"""
+        with self.lock:
+            if self._shadow is None or self.scroll_start or self.scroll_area != (0, HEIGHT, 0):
+                return None
+            return self._shadow.view(np.uint8).reshape(self.height, self.width, 2).copy()
+    
     def write_command(self, cmd):
-        GPIO.output(DC, GPIO.LOW)
-        GPIO.output(CS, GPIO.LOW)
-        self.spi.writebytes([cmd])
-        GPIO.output(CS, GPIO.HIGH)
+        self.bus.set_dc(0)
+        self.bus.set_cs(0)
+        try:
+            self.bus.write(bytes([cmd]))
+        finally:
+            self.bus.set_cs(1)
     
     def write_data(self, data):
-        GPIO.output(DC, GPIO.HIGH)
-        GPIO.output(CS, GPIO.LOW)
-        if isinstance(data, list):
-            self.spi.writebytes(data)
-        else:
-            self.spi.writebytes([data])
-        GPIO.output(CS, GPIO.HIGH)
+        self.bus.set_dc(1)
+        self.bus.set_cs(0)
+        try:
+            if isinstance(data, list):
+                self.bus.write(bytes(data))
+            else:
+                self.bus.write(bytes([data]))
+        finally:
+            self.bus.set_cs(1)
     
     def reset(self):
-        GPIO.output(RST, GPIO.HIGH)
-        time.sleep(0.005)
-        GPIO.output(RST, GPIO.LOW)
-        time.sleep(0.02)
-        GPIO.output(RST, GPIO.HIGH)
-        time.sleep(0.15)
+        self.bus.set_rst(1)
+        self.bus.delay(0.005)
+        self.bus.set_rst(0)
+        self.bus.delay(0.02)
+        self.bus.set_rst(1)
+        self.bus.delay(0.15)
     
     def set_rotation(self, rotation):
         """Set display rotation"""
@@ -84,7 +116,20 @@ class ILI9341:
     def init_display(self):
         print("Initializing ILI9341 display...")
         self.reset()
+        self.invalidate()
+        self.scroll_area = (0, HEIGHT, 0)
+        self.scroll_start = 0
         
+        self._send_config()
+        
+        self.bus.delay(0.12)
+        self.write_command(0x29)
+        self.bus.delay(0.05)
+        
+        print(f"Display initialized: {self.width}x{self.height}")
+    
+    def _send_config(self):
+        """Send the power, gamma and format settings, ending with sleep out"""
         # Optimized initialization sequence
         commands = [
             (0xEF, [0x03, 0x80, 0x02]),
@@ -114,59 +159,245 @@ class ILI9341:
             self.write_command(cmd)
             if data is not None:
                 self.write_data(data)
+    
+    def attach(self):
+        """Re-use a panel initialized earlier this boot: no reset and no init delays
+
+        The whole configuration is still sent, since the panel may have lost
+        power since it was initialized and the bus cannot read its state back.
+        """
+        key = getattr(self.bus, 'state_key', None)
+        boot_id = _boot_id()
+        if key is None or boot_id is None:
+            return False
+        state = _read_state()
+        if state.get('boot_id') != boot_id or key not in state.get('panels', {}):
+            return False
         
-        time.sleep(0.12)
-        self.write_command(0x29)
-        time.sleep(0.05)
-        
-        print(f"Display initialized: {self.width}x{self.height}")
+        with self.lock:
+            # Sleep out is harmless if already awake; only needs 5 ms before the next command
+            self._send_config()
+            self.bus.delay(0.005)
+            self.scroll_area = None  # Unknown - force reset_scroll to send it
+            self.reset_scroll()
+            self.write_command(ILI9341_DISPLAYON)
+            self.invalidate()
+        print(f"Re-attached to initialized panel: {self.width}x{self.height}")
+        return True
+    
+    def _save_state(self):
+        """Record that the panel is initialized, for attach() in later runs"""
+        key = getattr(self.bus, 'state_key', None)
+        boot_id = _boot_id()
+        if key is None or boot_id is None:
+            return
+        try:
+            # One entry per panel bus, so several panels can all re-attach
+            state = _read_state()
+            panels = state.get('panels', {}) if state.get('boot_id') == boot_id else {}
+            panels[key] = self.rotation
+            fd = os.open(PANEL_STATE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'boot_id': boot_id, 'panels': panels}, f)
+        except OSError as e:
+            print(f"Could not save panel state: {e}")
     
     def set_window(self, x0, y0, x1, y1):
         """Set the address window for drawing"""
+        start = time.perf_counter()
         self.write_command(ILI9341_COLADDRSET)
         self.write_data([x0 >> 8, x0 & 0xFF, x1 >> 8, x1 & 0xFF])
         self.write_command(ILI9341_PAGEADDRSET)
         self.write_data([y0 >> 8, y0 & 0xFF, y1 >> 8, y1 & 0xFF])
         self.write_command(ILI9341_MEMORYWRITE)
+        metrics.observe('set_window', time.perf_counter() - start)
     
-    def display_image(self, image_data):
-        """Display RGB565 image data - FIXED chunk size"""
-        if image_data is None:
-            return
+    def supports_vertical_scroll(self):
+        """Hardware scroll moves native panel rows, which are screen rows only without MV
+
+        With MY the screen shows the native rows bottom-up, so the scroll
+        area and start line are mirrored before they are sent.
+        """
+        return not self.rotation & MADCTL_MV
+    
+    def set_scroll_area(self, top_fixed, bottom_fixed):
+        """Define fixed top/bottom areas; the rows between them scroll"""
+        with self.lock:
+            height = HEIGHT - top_fixed - bottom_fixed
+            top, bottom = (bottom_fixed, top_fixed) if self.rotation & MADCTL_MY else (top_fixed, bottom_fixed)
+            self.write_command(ILI9341_VSCRDEF)
+            self.write_data([top >> 8, top & 0xFF, height >> 8, height & 0xFF,
+                             bottom >> 8, bottom & 0xFF])
+            self.scroll_area = (top_fixed, height, bottom_fixed)
+    
+    def set_scroll_start(self, line):
+        """Show memory row `line` at the top of the scroll area"""
+        with self.lock:
+            start = line
+            if self.rotation & MADCTL_MY:
+                # Screen rows run bottom-up through the panel's scroll area
+                top, height, bottom = self.scroll_area
+                start = bottom + (height - (line - top)) % height if height else 0
+            self.write_command(ILI9341_VSCRSADD)
+            self.write_data([start >> 8, start & 0xFF])
+            self.scroll_start = line
+    
+    def reset_scroll(self):
+        """Undo hardware scrolling so memory rows are screen rows again"""
+        with self.lock:
+            if self.scroll_area != (0, HEIGHT, 0) or self.scroll_start != 0:
+                self.set_scroll_area(0, 0)
+                self.set_scroll_start(0)
+                self.scroll_resets += 1
+    
+    def display_image(self, image_data, full=False):
+        """Display RGB565 image data, sending only the regions that changed"""
+        with self.lock:
+            if image_data is None:
+                return
             
-        # Set address window to full screen
-        self.set_window(0, 0, self.width - 1, self.height - 1)
+            # Frames are laid out for an unscrolled panel
+            self.reset_scroll()
+        
+            nbytes = image_data.nbytes if isinstance(image_data, np.ndarray) else len(image_data)
+            if nbytes != self.width * self.height * 2:
+                # Not a full frame for this orientation - push it raw
+                self.invalidate()
+                self.set_window(0, 0, self.width - 1, self.height - 1)
+                self._send_pixels(image_data)
+                return
+            frame = np.frombuffer(image_data, dtype=np.uint16).reshape(self.height, self.width)
+        
+            if full or self._shadow is None:
+                self.write_region(0, 0, self.width - 1, self.height - 1, frame)
+                return
+        
+            start = time.perf_counter()
+            rects = self._dirty_rects(frame)
+            metrics.observe('diff', time.perf_counter() - start)
+            changed_area = sum((x1 - x0 + 1) * (y1 - y0 + 1) for x0, y0, x1, y1 in rects)
+            if changed_area > DIRTY_RECT_FULL_RATIO * self.width * self.height:
+                self.write_region(0, 0, self.width - 1, self.height - 1, frame)
+                return
+        
+            for x0, y0, x1, y1 in rects:
+                self.write_region(x0, y0, x1, y1, frame[y0:y1 + 1, x0:x1 + 1])
+    
+    def display_field(self, image_data, parity):
+        """Send only the even (parity 0) or odd (parity 1) rows of a full RGB565 frame
+
+        The ILI9341 cannot skip rows while writing, so each row gets its own
+        one-row window: CASET once for the field, then PASET + RAMWR per row,
+        all inside a single chip select. Rows that already match the panel
+        are not sent. Until the panel contents are known the whole frame is
+        sent instead.
+        """
+        with self.lock:
+            if image_data is None:
+                return
+            self.reset_scroll()
+
+            nbytes = image_data.nbytes if isinstance(image_data, np.ndarray) else len(image_data)
+            if nbytes != self.width * self.height * 2 or self._shadow is None:
+                self.display_image(image_data, full=self._shadow is None)
+                return
+            frame = np.frombuffer(image_data, dtype=np.uint16).reshape(self.height, self.width)
+
+            start = time.perf_counter()
+            field = frame[parity::2]
+            changed = np.flatnonzero((field != self._shadow[parity::2]).any(axis=1))
+            metrics.observe('diff', time.perf_counter() - start)
+            if changed.size == 0:
+                return
+
+            x1 = self.width - 1
+            self.write_command(ILI9341_COLADDRSET)
+            self.write_data([0, 0, x1 >> 8, x1 & 0xFF])
+
+            start = time.perf_counter()
+            bus = self.bus
+            bus.set_cs(0)
+            try:
+                for y in (changed * 2 + parity).tolist():
+                    bus.set_dc(0)
+                    bus.write(bytes([ILI9341_PAGEADDRSET]))
+                    bus.set_dc(1)
+                    bus.write(bytes([y >> 8, y & 0xFF, y >> 8, y & 0xFF]))
+                    bus.set_dc(0)
+                    bus.write(bytes([ILI9341_MEMORYWRITE]))
+                    bus.set_dc(1)
+                    bus.write(frame[y])
+            finally:
+                # Also lets other panels on this SPI port have the bus again
+                bus.set_cs(1)
+            metrics.observe('spi', time.perf_counter() - start)
+            metrics.inc('bytes_sent', changed.size * self.width * 2)
+
+            self._shadow[parity::2] = field
+
+    def write_region(self, x0, y0, x1, y1, pixels):
+        """Write a (y1-y0+1) x (x1-x0+1) block of RGB565 pixels to the panel"""
+        with self.lock:
+            region = np.frombuffer(pixels, dtype=np.uint16) if not isinstance(pixels, np.ndarray) else pixels
+            if region.dtype == np.uint8:
+                # (h, w, 2) big-endian byte pairs
+                region = np.ascontiguousarray(region).view(np.uint16)
+            region = np.ascontiguousarray(region.reshape(y1 - y0 + 1, x1 - x0 + 1))
+        
+            self.set_window(x0, y0, x1, y1)
+            self._send_pixels(region)
         
-        # Send image data with smaller chunks to avoid overflow
-        GPIO.output(DC, GPIO.HIGH)
-        GPIO.output(CS, GPIO.LOW)
+            # Keep the shadow in sync with what is now on the panel
+            if self._shadow is None:
+                if (x0, y0, x1, y1) == (0, 0, self.width - 1, self.height - 1):
+                    self._shadow = region.copy()
+            else:
+                self._shadow[y0:y1 + 1, x0:x1 + 1] = region
+    
+    def _dirty_rects(self, frame):
+        """Return bounding rectangles (x0, y0, x1, y1) of pixels that differ from the shadow"""
+        changed = frame != self._shadow
+        rows = np.flatnonzero(changed.any(axis=1))
+        if rows.size == 0:
+            return []
         
-        # Use smaller chunk size to avoid SPI buffer overflow
-        chunk_size = 1024  # Reduced from 8192 to avoid "Argument list size exceeds 4096 bytes"
-        data_length = len(image_data)
+        # Split changed rows into bands, merging bands separated by small gaps
+        breaks = np.flatnonzero(np.diff(rows) > DIRTY_RECT_MERGE_GAP)
+        starts = np.concatenate((rows[:1], rows[breaks + 1]))
+        ends = np.concatenate((rows[breaks], rows[-1:]))
         
-        for i in range(0, data_length, chunk_size):
-            end = min(i + chunk_size, data_length)
-            # Convert slice to list for SPI transfer
-            chunk = list(image_data[i:end])
-            self.spi.writebytes(chunk)
+        rects = []
+        for y0, y1 in zip(starts.tolist(), ends.tolist()):
+            cols = np.flatnonzero(changed[y0:y1 + 1].any(axis=0))
+            rects.append((int(cols[0]), y0, int(cols[-1]), y1))
         
-        GPIO.output(CS, GPIO.HIGH)
+        if len(rects) > DIRTY_RECT_MAX_RECTS:
+            # Too many windows - one bounding box is cheaper than the command overhead
+            rects = [(min(r[0] for r in rects), rects[0][1],
+                      max(r[2] for r in rects), rects[-1][3])]
+        return rects
+    
+    def _send_pixels(self, pixel_data):
+        """Stream pixel data after a MEMORYWRITE command without per-byte conversion"""
+        start = time.perf_counter()
+        self.bus.set_dc(1)
+        self.bus.set_cs(0)
+        try:
+            self.bus.write(pixel_data)
+        finally:
+            self.bus.set_cs(1)
+        metrics.observe('spi', time.perf_counter() - start)
+        metrics.inc('bytes_sent', memoryview(pixel_data).nbytes)
     
     def fill_screen(self, color_high, color_low):
-        """Fill entire screen with a solid color - OPTIMIZED"""
-        # Create color data more efficiently
-        pixel_data = [color_high, color_low]
-        color_data = bytearray(pixel_data * (self.width * self.height))
-        self.display_image(color_data)
+        """Fill entire screen with a solid color"""
+        color = (color_high << 8) | color_low
+        color_data = np.full((self.height, self.width), color, dtype='>u2')
+        self.display_image(color_data.view(np.uint16))
     
     def clear_screen(self):
         """Clear screen to black"""
         self.fill_screen(0x00, 0x00)
     
     def cleanup(self):
-        try:
-            self.spi.close()
-        except:
-            pass
-        GPIO.cleanup()
\ No newline at end of file
+        self.bus.close()
\ No newline at end of file
@@ -3,46 +3,53 @@
 import sys
 import os
 import time
-from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
 class DualOutput:
-    def __init__(self, rotation='portrait', max_lines=15):
+    def __init__(self, rotation='portrait', max_lines=15, backend=None, warm=False):
         self.display = None
+        self.panels = []
+        self.panel_names = []
         self.console_active = False
         self.max_lines = max_lines
         self.lines = []
         self.current_line = ""
+        self.display_paused = False
         
         # Initialize display
-        self.init_display(rotation)
+        self.init_display(rotation, backend, warm)
     
-    def init_display(self, rotation):
+    def init_display(self, rotation, backend=None, warm=False):
         """Initialize the TFT display"""
         try:
             from display_driver import ILI9341, PORTRAIT, LANDSCAPE
+            from display_bus import create_bus
+            from display_config import PANELS
             
-            rotation_val = PORTRAIT if rotation == 'portrait' else LANDSCAPE
-            self.display = ILI9341(rotation=rotation_val)
+            if isinstance(rotation, int):
+                rotation_val = rotation  # Raw MADCTL value
+            else:
+                rotation_val = PORTRAIT if rotation == 'portrait' else LANDSCAPE
+            
+            # Every configured panel; the console lives on the first
+            for index, panel in enumerate(PANELS or [{}]):
+                self.panels.append(ILI9341(rotation=panel.get('rotation', rotation_val),
+                                           bus=create_bus(backend, panel), warm=warm))
+                self.panel_names.append(panel.get('name', f"panel{index}"))
+            self.display = self.panels[0]
             self.console_active = True
             
-            # Load font
-            try:
-                self.font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", 12)
-            except:
-                try:
-                    self.font = ImageFont.truetype("/usr/share/fonts/truetype/liberation/LiberationMono-Regular.ttf", 12)
-                except:
-                    self.font = ImageFont.load_default()
+            # Fonts and glyphs are loaded on the first console update
+            from display_config import CONSOLE_HW_SCROLL
+            self.atlas = None
+            self.frame = np.zeros((self.display.height, self.display.width, 2), dtype=np.uint8)
             
-            # Calculate character dimensions
-            try:
-                bbox = self.font.getbbox("A")
-                self.char_width = bbox[2] - bbox[0]
-                self.line_height = bbox[3] - bbox[1] + 2
-            except:
-                self.char_width = 8
-                self.line_height = 15
+            # Hardware scrolling: the console becomes a ring of line bands
+            self.hw_scroll = CONSOLE_HW_SCROLL and self.display.supports_vertical_scroll()
+            if CONSOLE_HW_SCROLL and not self.hw_scroll:
+                print("💡 Hardware scroll needs a rotation without MV - console redraws full frames")
+            self.lines_total = 0
+            self.ring_rows = 0
             
             print("✅ TFT Display console initialized")
             
@@ -75,7 +82,7 @@ class DualOutput:
             text = ' '.join(str(arg) for arg in args)
             self._add_to_display(text)
     
-    def _add_to_display(self, text):
+    def _add_to_display(self, text, update=True):
         """Add text to display buffer"""
         for char in text:
             if char == '\n':
@@ -83,63 +90,120 @@ class DualOutput:
             else:
                 self.current_line += char
         
-        self._update_display()
+        if update:
+            self._update_display()
     
     def _flush_display_line(self):
         """Add current line to display buffer"""
         if self.current_line:
             self.lines.append(self.current_line)
             self.current_line = ""
+            self.lines_total += 1
             
             # Keep only last max_lines
             if len(self.lines) > self.max_lines:
                 self.lines = self.lines[-self.max_lines:]
     
+    def _load_font(self):
+        """Rasterize console glyphs into a GlyphAtlas (imports PIL, so done on first use)"""
+        from glyph_atlas import GlyphAtlas, load_mono_font
+        from display_config import CONSOLE_MONO_GLYPHS
+        self.font = load_mono_font(12)
+        
+        # Calculate character dimensions
+        try:
+            bbox = self.font.getbbox("A")
+            line_height = bbox[3] - bbox[1] + 2
+        except:
+            line_height = 15
+        self.atlas = GlyphAtlas(self.font, line_height, mono=CONSOLE_MONO_GLYPHS)
+        self.char_width = self.atlas.cell_width
+        self.line_height = self.atlas.cell_height
+    
+    def pause_display(self):
+        """Keep buffering lines but stop drawing them (e.g. while media plays)"""
+        self.display_paused = True
+    
+    def resume_display(self):
+        """Draw the console again"""
+        self.display_paused = False
+    
     def _update_display(self):
         """Update the physical display"""
-        if not self.console_active:
+        if not self.console_active or self.display_paused:
+            return
+        if self.atlas is None:
+            self._load_font()
+        
+        if self.hw_scroll:
+            try:
+                self._update_scrolled()
+            except Exception as e:
+                print(f"❌ Display update error: {e}")
             return
             
         try:
-            # Create image
-            image = Image.new('RGB', (self.display.width, self.display.height), color=(0, 0, 0))
-            draw = ImageDraw.Draw(image)
-            
-            # Draw all lines
-            y_pos = 5
-            for line in self.lines:
-                try:
-                    draw.text((5, y_pos), line, fill=(255, 255, 255), font=self.font)
-                except:
-                    draw.text((5, y_pos), line, fill=(255, 255, 255))
-                y_pos += self.line_height
-            
-            # Draw current line (if any)
-            if self.current_line:
-                try:
-                    draw.text((5, y_pos), self.current_line, fill=(255, 255, 255), font=self.font)
-                except:
-                    draw.text((5, y_pos), self.current_line, fill=(255, 255, 255))
-            
-            # Convert to RGB565 and display
-            rgb565_data = self._image_to_rgb565(image)
-            self.display.display_image(rgb565_data)
+            # Compose the console straight into the RGB565 frame
+            lines = self.lines + [self.current_line] if self.current_line else self.lines
+            self.atlas.fill(self.frame)
+            self.atlas.draw_lines(self.frame, lines, 5, 5)
+            self.display.display_image(self.frame)
             
         except Exception as e:
             print(f"❌ Display update error: {e}")
     
-    def _image_to_rgb565(self, image):
-        """Convert PIL Image to RGB565 byte array"""
-        rgb_array = np.array(image, dtype=np.uint16)
+    def _setup_ring(self):
+        """Blank the screen and give the console rows to hardware scrolling"""
+        from display_config import CONSOLE_SCROLL_TOP, CONSOLE_SCROLL_BOTTOM
         
-        r = (rgb_array[:,:,0] >> 3) & 0x1F
-        g = (rgb_array[:,:,1] >> 2) & 0x3F  
-        b = (rgb_array[:,:,2] >> 3) & 0x1F
+        top = CONSOLE_SCROLL_TOP
+        self.ring_rows = max(min(self.max_lines + 1,
+                                 (self.display.height - top - CONSOLE_SCROLL_BOTTOM) // self.line_height), 1)
+        bottom = self.display.height - top - self.ring_rows * self.line_height
         
-        rgb565 = ((r << 11) | (g << 5) | b)
-        rgb565_bytes = rgb565.byteswap().tobytes()
+        self.atlas.fill(self.frame)
+        self.display.display_image(self.frame)
+        self.display.set_scroll_area(top, bottom)
+        self.display.set_scroll_start(top)
+        
+        self.ring_top = top
+        self.ring_head = 0  # Band shown at the top of the scroll area
+        self.ring_first = 0  # Console line number shown in the top row
+        self.ring_shown = [''] * self.ring_rows
+        self.ring_resets = self.display.scroll_resets
+        self.band = np.empty((self.line_height, self.display.width, 2), dtype=np.uint8)
+    
+    def _update_scrolled(self):
+        """Scroll in hardware and write only the line bands that changed"""
+        if not self.ring_rows or self.display.scroll_resets != self.ring_resets:
+            # First use, or a full frame was shown since
+            self._setup_ring()
+        
+        rows = self.lines + [self.current_line] if self.current_line else self.lines
+        first_line = self.lines_total - len(self.lines)
+        first = max(first_line + len(rows) - self.ring_rows, self.ring_first)
+        visible = rows[first - first_line:]
+        
+        shift = first - self.ring_first
+        if shift:
+            self.ring_head = (self.ring_head + shift) % self.ring_rows
+            if shift < self.ring_rows:
+                self.ring_shown = self.ring_shown[shift:] + [None] * shift
+            else:
+                self.ring_shown = [None] * self.ring_rows
+            self.ring_first = first
+            self.display.set_scroll_start(self.ring_top + self.ring_head * self.line_height)
         
-        return rgb565_bytes
+        width = self.display.width
+        for row in range(self.ring_rows):
+            text = visible[row] if row < len(visible) else ''
+            if text == self.ring_shown[row]:
+                continue
+            self.atlas.fill(self.band)
+            self.atlas.draw_text(self.band, text, 5, 0)
+            y0 = self.ring_top + ((self.ring_head + row) % self.ring_rows) * self.line_height
+            self.display.write_region(0, y0, width - 1, y0 + self.line_height - 1, self.band)
+            self.ring_shown[row] = text
     
     def clear_display(self):
         """Clear the TFT display"""
@@ -150,17 +214,17 @@ class DualOutput:
     
     def cleanup(self):
         """Clean up resources"""
-        if self.display:
-            self.display.cleanup()
+        for panel in self.panels:
+            panel.cleanup()
 
 # Global instance
 output = None
 
-def init_output(rotation='portrait'):
-    """Initialize the dual output system"""
+def init_output(rotation='portrait', backend=None, warm=False):
+    """Initialize the dual output system (warm=True re-attaches to an already configured panel)"""
     global output
     if output is None:
-        output = DualOutput(rotation)
+        output = DualOutput(rotation, backend=backend, warm=warm)
     return output
 
 # Convenience functions
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+
+import argparse
+import grp
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+import threading
+import numpy as np
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+sys.path.insert(0, current_dir)
+
+from display_config import DISPLAY_SOCKET_PATH, DISPLAY_SOCKET_MODE, DISPLAY_SOCKET_GROUP
+from display_output import init_output
+
+def socket_path_default():
+    return os.environ.get('RPI_DISPLAY_SOCKET', DISPLAY_SOCKET_PATH)
+
+class DisplayServer:
+    """Daemon that owns the panel and draws on behalf of client processes
+
+    Clients connect over a Unix socket and send one JSON message per line:
+      {"op": "print", "text": ...}    append text to the console
+      {"op": "frame"}                 show the RGB565 frame in a shared-memory file,
+                                      whose descriptor comes with the message (SCM_RIGHTS)
+      {"op": "clear"}                 clear the console
+      {"op": "info"}                  reply with the display size
+    Frame and info requests get a one-line JSON reply; prints are not
+    acknowledged. All drawing happens on one render thread, which applies
+    everything that arrived since its last pass and then updates the panel
+    once, so bursts of prints from many clients cost a single refresh.
+    Frames are only read through descriptors the client passes, so the
+    daemon never opens a path on a client's behalf.
+    """
+
+    def __init__(self, socket_path=None, rotation='portrait', backend=None):
+        self.socket_path = socket_path or socket_path_default()
+        self.output = init_output(rotation=rotation, backend=backend)
+        self.display = self.output.display
+        self.width = self.display.width if self.display else 320
+        self.height = self.display.height if self.display else 240
+
+        self._cond = threading.Condition()
+        self._events = []
+        self._pending_frame = np.zeros((self.height, self.width, 2), dtype=np.uint8)
+        self._frame = np.zeros_like(self._pending_frame)
+        self._stopping = False
+        self.updates = 0
+        self.requests = 0
+
+        self._sock = None
+        self._render_thread = threading.Thread(target=self._render_loop, name='display-render', daemon=True)
+
+    def serve_forever(self):
+        gid = self._socket_gid()
+        self._prepare_socket_dir(gid)
+        if os.path.lexists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.socket_path)
+        os.chown(self.socket_path, -1, gid)
+        os.chmod(self.socket_path, DISPLAY_SOCKET_MODE)
+        self._sock.listen(16)
+        self._render_thread.start()
+        print(f"Display server listening on {self.socket_path} ({self.width}x{self.height})")
+
+        try:
+            while not self._stopping:
+                try:
+                    conn, _ = self._sock.accept()
+                except OSError:
+                    break
+                threading.Thread(target=self._serve_client, args=(conn,),
+                                 name='display-client', daemon=True).start()
+        finally:
+            self.close()
+
+    @staticmethod
+    def _socket_gid():
+        """Group id for DISPLAY_SOCKET_GROUP (-1 to keep the daemon's group)"""
+        if not DISPLAY_SOCKET_GROUP:
+            return -1
+        try:
+            return grp.getgrnam(DISPLAY_SOCKET_GROUP).gr_gid
+        except KeyError:
+            raise RuntimeError(f"Group '{DISPLAY_SOCKET_GROUP}' does not exist - create it, "
+                               f"or set DISPLAY_SOCKET_GROUP = None for a root-only socket")
+
+    def _prepare_socket_dir(self, gid):
+        """Create the socket's directory, or check that nobody else can write to it
+
+        In a shared directory such as /tmp another user could take the
+        socket path while the daemon is down and pose as the daemon.
+        """
+        directory = os.path.dirname(os.path.abspath(self.socket_path))
+        try:
+            os.mkdir(directory, 0o750)
+            os.chown(directory, -1, gid)
+            os.chmod(directory, 0o750)
+            return
+        except FileExistsError:
+            pass
+        st = os.lstat(directory)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.geteuid() or st.st_mode & 0o022:
+            raise RuntimeError(f"{directory} must be a directory owned by this user and writable "
+                               f"by no one else - use a private directory for the socket")
+
+    # ---- client connections ----
+
+    def _serve_client(self, conn):
+        scratch = np.empty(self._pending_frame.nbytes, dtype=np.uint8)
+        fds = []  # Descriptors received but not yet claimed by a frame message
+        buffer = b''
+        try:
+            while True:
+                data, received, _, _ = socket.recv_fds(conn, 65536, 4)
+                fds.extend(received)
+                if not data or len(fds) > 4:
+                    # Closed, or descriptors piling up with no frame messages to claim them
+                    break
+                buffer += data
+                *lines, buffer = buffer.split(b'\n')
+                for line in lines:
+                    try:
+                        message = json.loads(line)
+                        reply = self._handle(message, scratch, fds)
+                    except (ValueError, KeyError, OSError) as e:
+                        reply = {'ok': False, 'error': str(e)}
+                    if reply is not None:
+                        conn.sendall(json.dumps(reply).encode() + b'\n')
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+
+    def _read_frame(self, fd, scratch):
+        """Read the frame file behind a passed descriptor into scratch
+
+        A read rather than a mapping: a client truncating its file while
+        the daemon copies would otherwise kill the daemon with SIGBUS.
+        """
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode):
+                raise ValueError("Frame descriptor is not a regular file")
+            if st.st_size != scratch.nbytes:
+                raise ValueError(f"Frame must be {self.width}x{self.height} RGB565 ({scratch.nbytes} bytes)")
+            if os.preadv(fd, [scratch], 0) != scratch.nbytes:
+                raise ValueError("Frame file was truncated")
+        finally:
+            os.close(fd)
+        return scratch
+
+    def _handle(self, message, scratch, fds):
+        op = message['op']
+        self.requests += 1
+        if op == 'print':
+            self._post(('print', message['text']))
+            return None
+        if op == 'clear':
+            self._post(('clear', None))
+            return None
+        if op == 'info':
+            return {'ok': True, 'width': self.width, 'height': self.height}
+        if op == 'frame':
+            if not fds:
+                raise ValueError("Frame message arrived without a file descriptor")
+            pixels = self._read_frame(fds.pop(0), scratch)
+            with self._cond:
+                # Only the newest frame is kept - older ones not yet drawn are dropped
+                np.copyto(self._pending_frame.reshape(-1), pixels)
+                self._events.append(('frame', None))
+                self._cond.notify()
+            return {'ok': True}
+        raise ValueError(f"Unknown op: {op}")
+
+    def _post(self, event):
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify()
+
+    # ---- drawing ----
+
+    def _render_loop(self):
+        while True:
+            with self._cond:
+                while not self._events and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                events, self._events = self._events, []
+                if any(kind == 'frame' for kind, _ in events):
+                    self._frame, self._pending_frame = self._pending_frame, self._frame
+
+            last = None
+            for kind, text in events:
+                if kind == 'print':
+                    self.output._add_to_display(text, update=False)
+                elif kind == 'clear':
+                    self.output.lines = []
+                    self.output.current_line = ""
+                last = kind
+
+            try:
+                if last == 'frame':
+                    if self.display:
+                        self.display.display_image(self._frame)
+                else:
+                    self.output._update_display()
+                self.updates += 1
+            except Exception as e:
+                print(f"❌ Display update error: {e}")
+
+    def close(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        if self._render_thread.is_alive():
+            self._render_thread.join(timeout=2.0)
+        print(f"Display server: {self.requests} requests, {self.updates} panel updates")
+        self.output.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description='Own the TFT panel and draw for client processes')
+    parser.add_argument('--socket', default=None, help='Unix socket path')
+    parser.add_argument('--rotation', default='portrait', choices=['portrait', 'landscape'])
+    parser.add_argument('--backend', choices=['spidev', 'sim'], default=None,
+                        help='Panel bus: real spidev hardware or the simulated framebuffer')
+    args = parser.parse_args()
+
+    server = DisplayServer(args.socket, args.rotation, args.backend)
+    # Stop cleanly under systemd/kill as well as Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nExiting...")
+    except (RuntimeError, OSError) as e:
+        print(f"❌ Display server cannot start: {e}")
+        server.close()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
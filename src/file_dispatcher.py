@@ -5,51 +5,66 @@ import numpy as np
 # Add the current directory to Python path to allow local imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import INTERLACE_FILE_TYPES
+
+def detect_file_type(file_path):
+    """Detect file type based on extension"""
+    ext = os.path.splitext(file_path)[1].lower()
+    
+    # Image formats
+    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp']
+    # Video formats  
+    video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv']
+    # GIF format
+    gif_extensions = ['.gif']
+    # Text formats
+    text_extensions = ['.txt', '.log', '.md', '.py', '.cpp', '.c', '.h', '.html', '.css', '.js']
+    # Pre-rendered RGB565 frame files (see transcode.py)
+    native_extensions = ['.r565']
+    
+    if ext in native_extensions:
+        return 'native'
+    elif ext in gif_extensions:
+        return 'gif'
+    elif ext in image_extensions:
+        return 'image'
+    elif ext in video_extensions:
+        return 'video'
+    elif ext in text_extensions:
+        return 'text'
+    else:
+        return 'unsupported'
 
 class FileDispatcher:
-    def __init__(self, file_path, display_width=320, display_height=240):
+    def __init__(self, file_path, display_width=320, display_height=240, rotation=0, follow=False):
         self.file_path = file_path
         self.display_width = display_width
         self.display_height = display_height
+        self.rotation = rotation
+        self.follow = follow
         self.handler = None
         self.file_type = self.detect_file_type()
         self.setup_handler()
     
     def detect_file_type(self):
         """Detect file type based on extension"""
-        ext = os.path.splitext(self.file_path)[1].lower()
-        
-        # Image formats
-        image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp']
-        # Video formats  
-        video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv']
-        # GIF format
-        gif_extensions = ['.gif']
-        # Text formats
-        text_extensions = ['.txt', '.log', '.md', '.py', '.cpp', '.c', '.h', '.html', '.css', '.js']
-        
-        if ext in gif_extensions:
-            return 'gif'
-        elif ext in image_extensions:
-            return 'image'
-        elif ext in video_extensions:
-            return 'video'
-        elif ext in text_extensions:
-            return 'text'
-        else:
-            return 'unsupported'
+        return detect_file_type(self.file_path)
     
     def setup_handler(self):
         """Setup appropriate handler based on file type"""
         try:
             if self.file_type == 'gif':
                 from gif_handler import GIFHandler
-                self.handler = GIFHandler(self.file_path, self.display_width, self.display_height)
+                self.handler = GIFHandler(self.file_path, self.display_width, self.display_height, self.rotation)
                 print("GIF handler initialized")
             
             elif self.file_type == 'image':
                 from image_handler import ImageHandler
-                self.handler = ImageHandler(self.file_path, self.display_width, self.display_height)
+                self.handler = ImageHandler(self.file_path, self.display_width, self.display_height, self.rotation)
                 print("Image handler initialized")
             
             elif self.file_type == 'video':
@@ -57,9 +72,15 @@ class FileDispatcher:
                 self.handler = VideoHandler(self.file_path, self.display_width, self.display_height)
                 print("Video handler initialized")
             
+            elif self.file_type == 'native':
+                from native_handler import NativeHandler
+                self.handler = NativeHandler(self.file_path, self.display_width, self.display_height, self.rotation)
+                print("Native handler initialized")
+            
             elif self.file_type == 'text':
                 from text_handler import TextHandler
-                self.handler = TextHandler(self.file_path, self.display_width, self.display_height)
+                self.handler = TextHandler(self.file_path, self.display_width, self.display_height,
+                                           follow=self.follow)
                 print("Text handler initialized")
             
             else:
@@ -78,7 +99,7 @@ class FileDispatcher:
             return None, 1000
         
         try:
-            if self.file_type in ['gif', 'video']:
+            if self.file_type in ['gif', 'video', 'native']:
                 return self.handler.get_next_frame()
             elif self.file_type == 'image':
                 # For static images, return the image once
@@ -93,14 +114,32 @@ class FileDispatcher:
             print(f"Error getting next frame: {e}")
             return None, 1000
     
+    def skip_frame(self):
+        """Advance past the next frame without rendering it
+
+        Returns the skipped frame's duration in ms, or None when this
+        content cannot skip frames cheaply.
+        """
+        if self.file_type not in ['gif', 'video', 'native'] or not hasattr(self.handler, 'skip_frame'):
+            return None
+        try:
+            return self.handler.skip_frame()
+        except Exception as e:
+            print(f"Error skipping frame: {e}")
+            return None
+    
     def is_supported(self):
-        """Check if file format is supported"""
-        return self.handler is not None
+        """Check if file format is supported (and its handler has not failed since)"""
+        return self.handler is not None and not getattr(self.handler, 'failed', False)
     
     def get_file_type(self):
         """Get detected file type"""
         return self.file_type
     
+    def interlaced(self):
+        """Whether this file type is sent as alternating even/odd row fields"""
+        return self.file_type in INTERLACE_FILE_TYPES
+    
     def cleanup(self):
         """Cleanup resources"""
         if self.handler and hasattr(self.handler, 'cleanup'):
@@ -0,0 +1,103 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVE_SELF = 0x00000800
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVE_SELF | IN_DELETE_SELF
+GONE_MASK = IN_MOVE_SELF | IN_DELETE_SELF | IN_IGNORED
+EVENT_HEADER = struct.Struct('iIII')
+
+class FileWatcher:
+    """Wait for a file to change - inotify where available, stat polling otherwise
+
+    When the file is moved or deleted (log rotation) the watch is dropped
+    and the path is polled until it reappears, then watched again.
+    """
+
+    def __init__(self, path, poll_interval=0.5):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._fd = None
+        self._wd = None
+        self._last_stat = self._stat()
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            self._libc = libc
+            self._fd = fd
+            self._add_watch()
+        except (OSError, AttributeError) as e:
+            print(f"inotify not available ({e}) - polling {path}")
+
+    @property
+    def using_inotify(self):
+        return self._wd is not None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_ino, st.st_size, st.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _add_watch(self):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(self.path), WATCH_MASK)
+        self._wd = wd if wd >= 0 else None
+
+    def _read_events(self):
+        """Drain pending events; drops the watch if the file went away"""
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size + length
+            if mask & GONE_MASK:
+                self._wd = None
+
+    def wait(self, timeout):
+        """Block up to timeout seconds; True if the file may have changed"""
+        if self._wd is not None:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            if not readable:
+                return False
+            self._read_events()
+            self._last_stat = self._stat()
+            return True
+
+        # Polling (no inotify, or waiting for a rotated file to reappear)
+        deadline = time.monotonic() + timeout
+        while True:
+            stat = self._stat()
+            if stat != self._last_stat:
+                self._last_stat = stat
+                if stat is not None and self._fd is not None:
+                    self._add_watch()
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._wd = None
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import sys
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import FRAME_CACHE_DIR, FRAME_CACHE_MAX_BYTES
+from frame_file import FrameFileWriter, MappedFrames, VERSION
+
+class FrameCache:
+    """On-disk cache of converted RGB565 frames, keyed by source content
+
+    Entries are frame files opened with mmap, so a cache hit starts playback
+    without decoding and keeps the frames out of the Python heap. The
+    directory is kept under max_bytes by evicting least recently used files.
+    """
+
+    def __init__(self, cache_dir=FRAME_CACHE_DIR, max_bytes=FRAME_CACHE_MAX_BYTES):
+        if not os.path.isabs(cache_dir):
+            cache_dir = os.path.join(parent_dir, cache_dir)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, source_path, width, height, rotation=0, variant=''):
+        """Cache key from the file's content hash and the render settings"""
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest.update(f"|{width}x{height}|{rotation}|{variant}|v{VERSION}".encode())
+        return digest.hexdigest()[:32]
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + '.r565')
+
+    def get(self, key):
+        """Return MappedFrames for key, or None on a miss"""
+        path = self.path(key)
+        try:
+            frames = MappedFrames(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return frames
+
+    def writer(self, key, width, height, rotation=0):
+        """Start a new entry; call close() on the writer, then evict()"""
+        return FrameFileWriter(self.path(key), width, height, rotation)
+
+    def store(self, key, width, height, rotation, frames, durations):
+        """Write a complete entry and return it memory-mapped"""
+        writer = self.writer(key, width, height, rotation)
+        try:
+            for frame, duration in zip(frames, durations):
+                writer.add(frame, duration)
+            writer.close()
+        except Exception:
+            writer.abort()
+            raise
+        self.evict(keep=key)
+        return self.get(key)
+
+    def entries(self):
+        """(mtime, size, path) for every cache entry, oldest first"""
+        result = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.r565'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            result.append((st.st_mtime, st.st_size, path))
+        return sorted(result)
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        keep_path = self.path(keep) if keep else None
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        return total
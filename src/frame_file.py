@@ -0,0 +1,124 @@
+import mmap
+import os
+import struct
+import zlib
+import numpy as np
+
+# On-disk layout of a pre-rendered RGB565 frame file (.r565):
+#
+#   header   32 bytes   magic, version, codec, width, height, rotation,
+#                       frame count, index offset
+#   payload  ...        frame data, back to back
+#   index    16 bytes   per frame: payload offset, payload size, duration (us)
+#
+# The index sits at the end so frames can be appended as they are decoded;
+# the header is patched when the writer is closed. All integers are
+# little-endian; pixels are big-endian RGB565 as sent to the panel.
+#
+# With CODEC_ZLIB each payload is zlib-compressed, except frames that do not
+# shrink, which are stored raw (payload size == width * height * 2).
+
+MAGIC = b'R565'
+VERSION = 2
+HEADER = struct.Struct('<4sHHHHHHIQ4x')
+INDEX_DTYPE = np.dtype([('offset', '<u8'), ('size', '<u4'), ('duration', '<u4')])
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+
+class FrameFileWriter:
+    """Append RGB565 frames to a new frame file, published atomically on close"""
+
+    def __init__(self, path, width, height, rotation=0, codec=CODEC_RAW, level=1):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        self.codec = codec
+        self.level = level
+        self.frame_size = width * height * 2
+        self._index = []
+        self._tmp_path = f"{path}.tmp.{os.getpid()}"
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(b'\0' * HEADER.size)
+
+    def add(self, frame, duration):
+        """Append one frame (any buffer of width*height*2 bytes), duration in ms"""
+        data = memoryview(frame).cast('B')
+        if len(data) != self.frame_size:
+            raise ValueError(f"Frame is {len(data)} bytes, expected {self.frame_size}")
+        if self.codec == CODEC_ZLIB:
+            packed = zlib.compress(data, self.level)
+            if len(packed) < len(data):
+                data = packed
+        offset = self._file.tell()
+        self._file.write(data)
+        self._index.append((offset, len(data), int(round(duration * 1000))))
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """Write the index and header, then move the file into place"""
+        index = np.array(self._index, dtype=INDEX_DTYPE)
+        index_offset = self._file.tell()
+        self._file.write(index.tobytes())
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.codec, self.width, self.height,
+                                     self.rotation, 0, len(self._index), index_offset))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard a partially written file"""
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+class MappedFrames:
+    """Read-only, memory-mapped view of a frame file
+
+    Behaves like a list of frames; each raw frame is a zero-copy uint8 array
+    backed by the page cache rather than the Python heap. Compressed frames
+    are inflated on access.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, codec, width, height, rotation, _, count, index_offset = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a frame file: {path}")
+
+        self.codec = codec
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        self.frame_size = width * height * 2
+        self.index = np.frombuffer(self._mm, dtype=INDEX_DTYPE, count=count, offset=index_offset)
+        self.durations = (self.index['duration'] / 1000.0).tolist()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        entry = self.index[i]
+        offset, size = int(entry['offset']), int(entry['size'])
+        if size == self.frame_size:
+            frame = np.frombuffer(self._mm, dtype=np.uint8, count=size, offset=offset)
+        else:
+            frame = np.frombuffer(zlib.decompress(self._mm[offset:offset + size]), dtype=np.uint8)
+        return frame.reshape(self.height, self.width, 2)
+
+    def close(self):
+        try:
+            self._mm.close()
+        except BufferError:
+            # Frames are still referenced; the mapping goes away with them
+            pass
@@ -0,0 +1,78 @@
+import time
+
+from metrics import metrics
+
+class FrameScheduler:
+    """Paces playback against the content timeline using monotonic deadlines
+
+    Each frame's presentation deadline is the previous deadline plus the
+    previous frame's duration, so sleep and processing errors do not
+    accumulate. When playback falls more than one frame interval behind,
+    behind() tells the caller to skip frames; if it falls more than
+    max_catchup seconds behind, the timeline is resynchronized instead.
+    """
+
+    def __init__(self, max_catchup=1.0):
+        self.max_catchup = max_catchup
+        self.started = time.monotonic()
+        self.frames_presented = 0
+        self.frames_dropped = 0
+        self.resyncs = 0
+        self._lateness_sum = 0.0
+        self._lateness_max = 0.0
+        self.reset()
+
+    def reset(self):
+        """Restart the timeline at now (after pauses or static content)"""
+        self._deadline = time.monotonic()
+        self._interval = 0.0
+
+    def behind(self):
+        """True when the next frame is already more than one interval late"""
+        if not self._interval:
+            return False
+        late = time.monotonic() - self._deadline
+        if late > self.max_catchup:
+            # Too far behind to catch up by skipping - start the timeline again
+            self.resyncs += 1
+            metrics.inc('resyncs')
+            self.reset()
+            return False
+        return late > self._interval
+
+    def drop(self, duration_ms):
+        """Account for a frame that was skipped without being shown"""
+        self._deadline += duration_ms / 1000.0
+        self.frames_dropped += 1
+        metrics.inc('frames_dropped')
+
+    def presented(self, duration_ms):
+        """Record that a frame was just shown and schedule the next deadline"""
+        lateness = max(time.monotonic() - self._deadline, 0.0)
+        self._lateness_sum += lateness
+        self._lateness_max = max(self._lateness_max, lateness)
+        metrics.observe('lateness', lateness)
+        self.frames_presented += 1
+
+        self._interval = duration_ms / 1000.0
+        self._deadline += self._interval
+
+    def wait(self):
+        """Sleep until the next frame's deadline (no sleep when already late)"""
+        delay = self._deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+            metrics.observe('sleep', delay)
+        return delay
+
+    def fps(self):
+        """Presented frames per second since the scheduler was created"""
+        elapsed = time.monotonic() - self.started
+        return self.frames_presented / elapsed if elapsed > 0 else 0.0
+    
+    def mean_jitter(self):
+        """Average lateness of presented frames, in seconds"""
+        return self._lateness_sum / self.frames_presented if self.frames_presented else 0.0
+
+    def max_jitter(self):
+        return self._lateness_max
@@ -0,0 +1,122 @@
+import queue
+import threading
+import time
+import numpy as np
+
+from metrics import metrics
+
+class FrameSender:
+    """Transmit thread that owns the display and sends frames from a double buffer
+
+    submit() copies a frame into a free slot and returns at once, so the
+    caller can prepare the next frame while this one goes out over SPI
+    (spidev writes release the GIL). When every slot is queued or being
+    sent, submit() blocks until one frees up.
+
+    With interlace set, each frame is sent as a single field - its even
+    rows, then the next frame's odd rows - halving the bytes per frame.
+    """
+
+    def __init__(self, display, slots=2, interlace=False):
+        self.display = display
+        self.interlace = interlace
+        self._parity = 0
+        self._buffers = [None] * slots
+        self._free = queue.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+        self._pending = queue.Queue()
+        self.error = None
+        self.frames_sent = 0
+        self.fields_sent = 0
+        self.started = time.monotonic()
+
+        self._thread = threading.Thread(target=self._run, name='frame-sender', daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        """Queue a frame for display; the frame buffer may be reused once this returns"""
+        if self.error:
+            raise self.error
+
+        slot = self._free.get()
+        data = np.frombuffer(memoryview(frame).cast('B'), dtype=np.uint8)
+        buffer = self._buffers[slot]
+        if buffer is None or buffer.size != data.size:
+            buffer = self._buffers[slot] = np.empty(data.size, dtype=np.uint8)
+        np.copyto(buffer, data)
+        self._pending.put(slot)
+
+    def flush(self):
+        """Wait until every submitted frame has been sent"""
+        self._pending.join()
+
+    def field_rate(self):
+        """Interlaced fields sent per second since the sender started"""
+        elapsed = time.monotonic() - self.started
+        return self.fields_sent / elapsed if elapsed > 0 else 0.0
+
+    def close(self):
+        """Finish the frame in flight and stop the thread"""
+        self._pending.put(None)
+        self._thread.join(timeout=2.0)
+
+    def _run(self):
+        while True:
+            slot = self._pending.get()
+            try:
+                if slot is None:
+                    return
+                start = time.perf_counter()
+                if self.interlace:
+                    self.display.display_field(self._buffers[slot], self._parity)
+                    self._parity ^= 1
+                    self.fields_sent += 1
+                    metrics.inc('fields_sent')
+                else:
+                    self.display.display_image(self._buffers[slot])
+                metrics.observe('transmit', time.perf_counter() - start)
+                self.frames_sent += 1
+                metrics.inc('frames_sent')
+            except Exception as e:
+                print(f"Frame transmit error: {e}")
+                self.error = e
+            finally:
+                if slot is not None:
+                    self._free.put(slot)
+                self._pending.task_done()
+
+class FrameSenderGroup:
+    """Fans one stream of frames out to several panels, each with its own FrameSender
+
+    A frame is rendered once and copied into every panel's buffer; each
+    panel transmits on its own thread, so a slow write to one does not
+    hold up the others beyond their double buffering.
+    """
+
+    def __init__(self, senders):
+        self.senders = senders
+
+    @property
+    def interlace(self):
+        return self.senders[0].interlace
+
+    @interlace.setter
+    def interlace(self, value):
+        for sender in self.senders:
+            sender.interlace = value
+
+    def submit(self, frame):
+        for sender in self.senders:
+            sender.submit(frame)
+
+    def flush(self):
+        for sender in self.senders:
+            sender.flush()
+
+    def field_rate(self):
+        return min(sender.field_rate() for sender in self.senders)
+
+    def close(self):
+        for sender in self.senders:
+            sender.close()
@@ -0,0 +1,129 @@
+import hashlib
+import numpy as np
+
+# Entry kinds
+REF = 0     # Identical to an earlier frame
+RAW = 1     # Keyframe, uncompressed
+RLE = 2     # Keyframe, runs of equal pixels
+DELTA = 3   # Changed pixel spans relative to the previous frame
+
+class FrameStore:
+    """Compact in-memory store for a sequence of RGB565 frames
+
+    Identical frames are interned by hash. Every other frame is kept as
+    whichever is smallest of a raw keyframe, a run-length encoded keyframe,
+    or the spans of pixels that changed since the previous frame. A
+    keyframe is forced every keyframe_interval stored frames so random
+    access never replays more than that many deltas.
+
+    Frames are decoded into one reusable buffer: the array returned by
+    store[i] is overwritten by the next lookup.
+    """
+
+    def __init__(self, width, height, keyframe_interval=30):
+        self.width = width
+        self.height = height
+        self.keyframe_interval = keyframe_interval
+        self.pixels = width * height
+
+        self._entries = []
+        self._hashes = {}
+        self._prev = None
+        self._since_keyframe = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+        # Decode state: the content of frame self._current
+        self._state = np.zeros(self.pixels, dtype=np.uint16)
+        self._current = -1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        for i in range(len(self._entries)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self._entries)
+        if not 0 <= i < len(self._entries):
+            raise IndexError("frame index out of range")
+        self._decode(i)
+        return self._state.view(np.uint8).reshape(self.height, self.width, 2)
+
+    def append(self, frame):
+        """Add one frame (any buffer of width*height*2 bytes)"""
+        cur = np.frombuffer(memoryview(frame).cast('B'), dtype=np.uint16)
+        if cur.size != self.pixels:
+            raise ValueError(f"Frame has {cur.size} pixels, expected {self.pixels}")
+        self.raw_bytes += cur.nbytes
+
+        digest = hashlib.blake2b(cur, digest_size=16).digest()
+        index = len(self._entries)
+        if digest in self._hashes:
+            entry = (REF, self._hashes[digest])
+        else:
+            self._hashes[digest] = index
+            entry = self._encode(cur)
+        self._entries.append(entry)
+        self.stored_bytes += self._entry_size(entry)
+        self._prev = cur.copy()
+
+    def compression_ratio(self):
+        return self.raw_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+    # ---- encoding ----
+
+    def _encode(self, cur):
+        candidates = [(RAW, cur.copy())]
+
+        # Runs of equal pixels
+        starts = np.concatenate(([0], np.flatnonzero(cur[1:] != cur[:-1]) + 1)).astype(np.uint32)
+        if starts.size * 6 < cur.nbytes:
+            candidates.append((RLE, starts, cur[starts]))
+
+        # Spans that changed since the previous frame
+        if self._prev is not None and self._since_keyframe < self.keyframe_interval:
+            changed = np.flatnonzero(cur != self._prev)
+            if changed.size * 2 < cur.nbytes:
+                breaks = np.flatnonzero(np.diff(changed) != 1) + 1
+                span_starts = changed[np.concatenate(([0], breaks))] if changed.size else changed
+                span_lengths = np.diff(np.concatenate(([0], breaks, [changed.size]))) \
+                    if changed.size else changed
+                candidates.append((DELTA, span_starts.astype(np.uint32),
+                                   span_lengths.astype(np.uint32), cur[changed]))
+
+        entry = min(candidates, key=self._entry_size)
+        self._since_keyframe = self._since_keyframe + 1 if entry[0] == DELTA else 0
+        return entry
+
+    @staticmethod
+    def _entry_size(entry):
+        return sum(part.nbytes for part in entry[1:] if isinstance(part, np.ndarray))
+
+    # ---- decoding ----
+
+    def _decode(self, i):
+        if i == self._current:
+            return
+        entry = self._entries[i]
+        kind = entry[0]
+
+        if kind == REF:
+            self._decode(entry[1])
+        elif kind == RAW:
+            self._state[:] = entry[1]
+        elif kind == RLE:
+            starts, values = entry[1], entry[2]
+            lengths = np.diff(np.append(starts, self.pixels))
+            self._state[:] = np.repeat(values, lengths)
+        else:
+            if self._current != i - 1:
+                self._decode(i - 1)
+            starts, lengths, values = entry[1], entry[2], entry[3]
+            if values.size:
+                # Expand spans to pixel positions: start of each span + offset within it
+                offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+                self._state[offsets + np.arange(values.size, dtype=np.uint32)] = values
+        self._current = i
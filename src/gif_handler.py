@@ -1,88 +1,261 @@
-from PIL import Image, ImageSequence
 import numpy as np
 import os
+import queue
 import sys
+import threading
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import GIF_RESIZE_BACKEND, FRAME_CACHE_ENABLED, GIF_MEMORY_BUDGET, GIF_STREAM_AHEAD
+from display_config import GIF_FRAME_STORAGE, FRAME_STORE_KEYFRAME_INTERVAL
+from rgb565 import RGB565Converter
+from frame_cache import FrameCache
+from frame_store import FrameStore
 
 # Import our dual output system
 from display_output import init_output, printf, display_print, dual_print
 
+# ===== ANTI-BLINKING SETTINGS =====
+MIN_FRAME_DURATION = 50  # Minimum frame duration in ms (increase if blinking)
+MAX_FRAME_DURATION = 200 # Maximum frame duration in ms
+# ==================================
+
 class GIFHandler:
-    def __init__(self, gif_path, display_width=320, display_height=240):
+    def __init__(self, gif_path, display_width=320, display_height=240, rotation=0):
         self.gif_path = gif_path
         self.display_width = display_width
         self.display_height = display_height
+        self.rotation = rotation
         self.frames = []
         self.durations = []
         self.current_frame = 0
+        self.frame_count = 0
+        self.converter = RGB565Converter(display_width, display_height, resize=GIF_RESIZE_BACKEND)
+        
+        # Streaming mode state (frames decoded ahead into a small ring)
+        self.streaming = False
+        self.failed = False  # Decoding broke off - nothing more will come
+        self._stream_thread = None
+        self._stop = threading.Event()
+        self._ring = []
+        self._free = None
+        self._ready = None
+        self._held = None
+        self._pass_done = threading.Event()
+        
         self.load_gif()
     
     def load_gif(self):
         """Load GIF and convert frames to RGB565 format"""
         dual_print(f"Loading GIF from {self.gif_path}")
         try:
+            cache, cache_key = self._open_cache()
+            if cache:
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    self.frames = cached
+                    self.durations = cached.durations
+                    self.frame_count = len(cached)
+                    print(f"Loaded {len(self.frames)} frames from cache")
+                    if GIF_FRAME_STORAGE == 'compact':
+                        self.frames = self._compact(cached)
+                        cached.close()
+                    return
+            
+            from PIL import Image, ImageSequence
             gif = Image.open(self.gif_path)
+            self.frame_count = gif.n_frames
             print(f"Original GIF: {gif.size}, {gif.n_frames} frames")
             print(f"Target display: {self.display_width}x{self.display_height}")
             
-            # ===== ANTI-BLINKING SETTINGS =====
-            MIN_FRAME_DURATION = 50  # Minimum frame duration in ms (increase if blinking)
-            MAX_FRAME_DURATION = 200 # Maximum frame duration in ms
-            # ==================================
+            # Too big to hold every converted frame? Decode lazily instead
+            resident_bytes = gif.n_frames * self.display_width * self.display_height * 2
+            if resident_bytes > GIF_MEMORY_BUDGET:
+                print(f"GIF needs {resident_bytes / 1024 / 1024:.1f} MB resident "
+                      f"(budget {GIF_MEMORY_BUDGET / 1024 / 1024:.1f} MB) - streaming")
+                self._start_stream(gif, cache, cache_key)
+                return
             
+            # Frames are kept deduplicated and delta/RLE compressed while loading
+            self.frames = FrameStore(self.display_width, self.display_height,
+                                     FRAME_STORE_KEYFRAME_INTERVAL)
             frame_count = 0
             for frame in ImageSequence.Iterator(gif):
-                # Convert to RGB if necessary
-                if frame.mode != 'RGB':
-                    frame_rgb = frame.convert('RGB')
-                else:
-                    frame_rgb = frame.copy()
-                
-                # Resize to fit display - SIMPLE STRETCH
-                resized_frame = frame_rgb.resize((self.display_width, self.display_height), 
-                                               Image.Resampling.LANCZOS)
-                
-                # Convert to RGB565
-                rgb565_data = self.rgb_to_rgb565(resized_frame)
+                # Resize to fit display (simple stretch) and convert to RGB565
+                rgb565_data = self.converter.convert(frame)
                 self.frames.append(rgb565_data)
-                
-                # Get and adjust duration to prevent blinking
-                duration = frame.info.get('duration', 100)
-                
-                # Apply minimum and maximum duration limits
-                if duration < MIN_FRAME_DURATION:
-                    duration = MIN_FRAME_DURATION
-                elif duration > MAX_FRAME_DURATION:
-                    duration = MAX_FRAME_DURATION
-                    
-                self.durations.append(duration)
+                self.durations.append(self._frame_duration(frame))
                 frame_count += 1
                 
                 # Progress indicator for large GIFs
                 if frame_count % 10 == 0:
                     print(f"Processed frame {frame_count}/{gif.n_frames}")
             
-            print(f"Processed {len(self.frames)} frames")
+            print(f"Processed {len(self.frames)} frames "
+                  f"({self.frames.compression_ratio():.1f}x compressed in memory)")
             print(f"Frame duration range: {min(self.durations)}-{max(self.durations)}ms")
             
+            if cache:
+                cached = cache.store(cache_key, self.display_width, self.display_height,
+                                     self.rotation, self.frames, self.durations)
+                if cached is not None and GIF_FRAME_STORAGE == 'mapped':
+                    # Swap the heap copies for the memory-mapped cache entry
+                    self.frames = cached
+            
         except Exception as e:
             print(f"Error loading GIF: {e}")
             raise
     
-    def rgb_to_rgb565(self, image):
-        """Convert PIL Image to RGB565 byte array - OPTIMIZED"""
-        rgb_array = np.array(image, dtype=np.uint16)
+    def _compact(self, frames):
+        """Copy a frame sequence into a compressed in-memory FrameStore"""
+        store = FrameStore(self.display_width, self.display_height, FRAME_STORE_KEYFRAME_INTERVAL)
+        for frame in frames:
+            store.append(frame)
+        print(f"Frames compacted {store.compression_ratio():.1f}x in memory")
+        return store
+    
+    def _frame_duration(self, frame):
+        """Frame duration in ms, clamped to prevent blinking"""
+        duration = frame.info.get('duration', 100)
         
-        r = (rgb_array[:,:,0] >> 3) & 0x1F
-        g = (rgb_array[:,:,1] >> 2) & 0x3F  
-        b = (rgb_array[:,:,2] >> 3) & 0x1F
+        # Apply minimum and maximum duration limits
+        if duration < MIN_FRAME_DURATION:
+            duration = MIN_FRAME_DURATION
+        elif duration > MAX_FRAME_DURATION:
+            duration = MAX_FRAME_DURATION
+        return duration
+    
+    def _start_stream(self, gif, cache=None, cache_key=None):
+        """Start decoding frames into the ring buffer on a background thread
+
+        Each stream gets its own stop event and queues, so a decoder that is
+        still winding down can never feed slots to the one replacing it.
+        """
+        self.streaming = True
+        self.current_frame = 0
+        if not self._ring:
+            # One slot per frame decoded ahead, plus the one being displayed
+            self._ring = [self.converter.new_buffer() for _ in range(GIF_STREAM_AHEAD + 1)]
+        self._stop = threading.Event()
+        self._free = queue.Queue()
+        for slot in range(len(self._ring)):
+            self._free.put(slot)
+        self._ready = queue.Queue()
+        self._held = None
+        self._pass_done = threading.Event()
         
-        rgb565 = ((r << 11) | (g << 5) | b)
-        rgb565_bytes = rgb565.byteswap().tobytes()
+        self._stream_thread = threading.Thread(target=self._stream_frames,
+                                               args=(gif, cache, cache_key, self._stop, self._free,
+                                                     self._ready, self.durations, self._pass_done),
+                                               daemon=True)
+        self._stream_thread.start()
+    
+    @staticmethod
+    def _take_free_slot(stop, free):
+        """Wait for a free ring slot; None once the stream is stopped"""
+        while not stop.is_set():
+            try:
+                return free.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
+    
+    def _stream_frames(self, gif, cache, cache_key, stop, free, ready, durations, pass_done):
+        """Decoder thread: loop over the GIF forever, staying a few frames ahead"""
+        from PIL import ImageSequence
+        # Write the first pass through to the frame cache so the next start is instant
+        writer = cache.writer(cache_key, self.display_width, self.display_height,
+                              self.rotation) if cache else None
+        first_pass = True
+        try:
+            while not stop.is_set():
+                for frame in ImageSequence.Iterator(gif):
+                    slot = self._take_free_slot(stop, free)
+                    if slot is None:
+                        return
+                    rgb565_data = self.converter.convert(frame, out=self._ring[slot])
+                    duration = self._frame_duration(frame)
+                    if first_pass:
+                        durations.append(duration)
+                        if writer is not None:
+                            writer.add(rgb565_data, duration)
+                    ready.put((slot, duration))
+                
+                if writer is not None:
+                    writer.close()
+                    cache.evict(keep=cache_key)
+                    writer = None
+                    print(f"Cached {len(durations)} streamed frames")
+                first_pass = False
+                pass_done.set()
+        except Exception as e:
+            print(f"Error streaming GIF: {e}")
+            ready.put(None)
+        finally:
+            if writer is not None:
+                writer.abort()
+            gif.close()
+    
+    def _next_streamed_frame(self):
+        """Hand out the next decoded frame, returning the previous slot to the decoder"""
+        if self._held is not None:
+            self._free.put(self._held)
+            self._held = None
         
-        return rgb565_bytes
+        while True:
+            try:
+                item = self._ready.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if not self._stream_thread.is_alive():
+                    item = None
+                    break
+        if item is None:
+            self._stream_failed()
+            return None, 100
+        slot, duration = item
+        self._held = slot
+        self.current_frame = (self.current_frame + 1) % self.frame_count
+        return self._ring[slot], duration
+    
+    def _stream_failed(self):
+        """The decoder died - nothing is left to show, so stop handing out frames"""
+        self._stop_stream()
+        self.streaming = False
+        self.failed = True
+        self.frames = []
+        self.durations = []
+    
+    def _stop_stream(self):
+        self._stop.set()
+        if self._stream_thread:
+            # The decoder checks the stop event between frames and every 0.1 s while
+            # waiting for a slot; wait it out so the ring is never shared
+            self._stream_thread.join()
+            self._stream_thread = None
+    
+    def _open_cache(self):
+        """Return (FrameCache, key) for this GIF, or (None, None) if caching is off"""
+        if not FRAME_CACHE_ENABLED:
+            return None, None
+        try:
+            cache = FrameCache()
+            variant = f"gif|{GIF_RESIZE_BACKEND}|{MIN_FRAME_DURATION}-{MAX_FRAME_DURATION}"
+            key = cache.key(self.gif_path, self.display_width, self.display_height,
+                            self.rotation, variant)
+            return cache, key
+        except OSError as e:
+            print(f"Frame cache unavailable: {e}")
+            return None, None
     
     def get_next_frame(self):
         """Get next frame and its duration"""
+        if self.streaming:
+            return self._next_streamed_frame()
         if not self.frames:
             return None, 100
             
@@ -92,9 +265,45 @@ class GIFHandler:
         self.current_frame = (self.current_frame + 1) % len(self.frames)
         return frame_data, duration
     
+    def skip_frame(self):
+        """Advance one frame without returning it; returns its duration"""
+        if self.streaming:
+            frame_data, duration = self._next_streamed_frame()
+            return None if frame_data is None else duration
+        if not self.durations:
+            return None
+        duration = self.durations[self.current_frame]
+        self.current_frame = (self.current_frame + 1) % len(self.durations)
+        return duration
+    
     def get_frame_count(self):
-        return len(self.frames)
+        return self.frame_count
+    
+    def finish_first_pass(self):
+        """Consume a streamed GIF until its first pass is decoded (and so cached)"""
+        while self.streaming and not self._pass_done.is_set():
+            if self._next_streamed_frame()[0] is None:
+                return
+    
+    def is_cached(self):
+        """Whether this GIF's converted frames are in the frame cache"""
+        cache, cache_key = self._open_cache()
+        return cache is not None and os.path.exists(cache.path(cache_key))
     
     def reset(self):
         """Reset to first frame"""
-        self.current_frame = 0
\ No newline at end of file
+        if self.streaming:
+            # Restart the decoder from frame 0
+            self._stop_stream()
+            self.durations = []
+            cache, cache_key = self._open_cache()
+            if cache and os.path.exists(cache.path(cache_key)):
+                cache = None  # The first pass already reached the cache
+            from PIL import Image
+            self._start_stream(Image.open(self.gif_path), cache, cache_key)
+        self.current_frame = 0
+    
+    def cleanup(self):
+        """Stop the decoder thread, if any"""
+        if self.streaming:
+            self._stop_stream()
\ No newline at end of file
@@ -0,0 +1,133 @@
+import os
+import sys
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import FONT_SIZE, TEXT_COLOR, BACKGROUND_COLOR
+from rgb565 import pack_rgb565
+
+MONO_FONTS = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationMono-Regular.ttf",
+)
+
+# Sample used to find how far ink reaches above and below the baseline
+_INK_SAMPLE = "Agjpqy|[]_(){}"
+
+def load_mono_font(size=FONT_SIZE):
+    """Load the first available monospace TrueType font, else PIL's default"""
+    for path in MONO_FONTS:
+        try:
+            return ImageFont.truetype(path, size)
+        except (OSError, IOError):
+            continue
+    return ImageFont.load_default()
+
+class GlyphAtlas:
+    """Monospace glyphs rasterized once and blitted as RGB565 tiles
+
+    Each character is drawn with PIL the first time it is seen, into a
+    (cell_height, cell_width) coverage mask. For every (fg, bg) colour pair
+    the masks go through a 256-entry RGB565 lookup table once, giving a
+    stack of ready-to-send tiles; a block of text is then a single NumPy
+    gather from that stack. With mono=True glyphs are rasterized 1-bit,
+    the cheapest and crispest choice for plain white-on-black consoles.
+    """
+
+    def __init__(self, font=None, line_height=None, mono=False):
+        self.font = font or load_mono_font()
+        self.mono = mono
+
+        # Advance of the widest ASCII glyph, so proportional fallbacks still fit
+        self.cell_width = max(int(np.ceil(self.font.getlength(chr(c)))) for c in range(32, 127))
+        left, top, right, bottom = self.font.getbbox(_INK_SAMPLE)
+        self._ink_top = top
+        self.cell_height = max(line_height or 0, bottom - top)
+
+        self._slots = {}
+        self._coverage = np.zeros((0, self.cell_height, self.cell_width), dtype=np.uint8)
+        self._palettes = {}
+        self.blank = self._slot(' ')
+
+    def _slot(self, char):
+        """Index of char's coverage mask, rasterizing it on first use"""
+        slot = self._slots.get(char)
+        if slot is None:
+            image = Image.new('L', (self.cell_width, self.cell_height), 0)
+            draw = ImageDraw.Draw(image)
+            if self.mono:
+                draw.fontmode = '1'
+            draw.text((0, -self._ink_top), char, fill=255, font=self.font)
+            mask = np.asarray(image)[np.newaxis]
+            self._coverage = np.concatenate((self._coverage, mask))
+            slot = self._slots[char] = len(self._slots)
+        return slot
+
+    def _tiles(self, fg, bg):
+        """RGB565 tile stack for a colour pair, extended as new glyphs appear"""
+        key = (tuple(fg), tuple(bg))
+        lut, tiles = self._palettes.get(key, (None, None))
+        if lut is None:
+            # Blend bg -> fg over the 256 coverage levels, then pack once
+            level = np.arange(256, dtype=np.uint16)[:, np.newaxis]
+            fg_arr = np.array(fg, dtype=np.uint16)
+            bg_arr = np.array(bg, dtype=np.uint16)
+            blended = ((bg_arr * (255 - level) + fg_arr * level + 127) // 255).astype(np.uint8)
+            lut = pack_rgb565(blended[np.newaxis], np.empty((1, 256, 2), dtype=np.uint8))[0]
+            tiles = lut[self._coverage[:0]]
+        if len(tiles) < len(self._coverage):
+            tiles = np.concatenate((tiles, lut[self._coverage[len(tiles):]]))
+        self._palettes[key] = (lut, tiles)
+        return tiles
+
+    def columns(self, width):
+        """Characters that fit in width pixels"""
+        return width // self.cell_width
+
+    def rows(self, height):
+        """Lines that fit in height pixels"""
+        return height // self.cell_height
+
+    def draw_lines(self, out, lines, x, y, fg=TEXT_COLOR, bg=BACKGROUND_COLOR):
+        """Draw lines of text into out, an (h, w, 2) RGB565 array, clipped to its edges
+
+        Each line is padded with bg to the longest line; the area outside the
+        text block is left untouched.
+        """
+        height, width = out.shape[:2]
+        rows = min(len(lines), max((height - y) // self.cell_height, 0))
+        cols = min(max((len(line) for line in lines[:rows]), default=0),
+                   max((width - x) // self.cell_width, 0))
+        if rows == 0 or cols == 0:
+            return out
+
+        grid = np.full((rows, cols), self.blank, dtype=np.intp)
+        slot = self._slot
+        for row, line in enumerate(lines[:rows]):
+            grid[row, :len(line[:cols])] = [slot(char) for char in line[:cols]]
+
+        tiles = self._tiles(fg, bg)
+        block = tiles[grid]  # (rows, cols, cell_h, cell_w, 2)
+        ch, cw = self.cell_height, self.cell_width
+        out[y:y + rows * ch, x:x + cols * cw] = block.transpose(0, 2, 1, 3, 4).reshape(rows * ch, cols * cw, 2)
+        return out
+
+    def draw_text(self, out, text, x, y, fg=TEXT_COLOR, bg=BACKGROUND_COLOR):
+        """Draw a single line of text into out"""
+        return self.draw_lines(out, [text], x, y, fg, bg)
+
+    def fill(self, out, color=BACKGROUND_COLOR):
+        """Fill out with a solid colour"""
+        pixel = self._tiles(color, color)[self.blank, 0, 0]
+        if out.flags.c_contiguous:
+            # One 16-bit store per pixel instead of a broadcast over byte pairs
+            out.view(np.uint16).fill(pixel.view(np.uint16)[0])
+        else:
+            out[...] = pixel
+        return out
@@ -1,17 +1,27 @@
-from PIL import Image
 import numpy as np
 import os
 import sys
 
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import IMAGE_RESIZE_BACKEND, FRAME_CACHE_ENABLED
+from display_config import IMAGE_DRAFT, IMAGE_RESAMPLE, IMAGE_REDUCING_GAP
+from rgb565 import RGB565Converter
+from frame_cache import FrameCache
 
 # Import our dual output system
 from display_output import init_output, printf, display_print, dual_print
 
 class ImageHandler:
-    def __init__(self, image_path, display_width=320, display_height=240):
+    def __init__(self, image_path, display_width=320, display_height=240, rotation=0):
         self.image_path = image_path
         self.display_width = display_width
         self.display_height = display_height
+        self.rotation = rotation
         self.image_data = None
         self.load_image()
     
@@ -19,22 +29,37 @@ class ImageHandler:
         """Load and prepare image for display"""
         display_print("\n\n\n======== Loading image...=========\n\nPath: {}".format(self.image_path))
         try:
+            cache, cache_key = self._open_cache()
+            if cache:
+                cached = cache.get(cache_key)
+                if cached is not None and len(cached):
+                    self.image_data = cached[0]
+                    dual_print("\nImage loaded from cache")
+                    return
+            
+            from PIL import Image
             image = Image.open(self.image_path)
             dual_print(f"\nOriginal image: {image.size}, Mode: {image.mode}")
             dual_print(f"\nTarget display: {self.display_width}x{self.display_height}")
             
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image_rgb = image.convert('RGB')
-            else:
-                image_rgb = image.copy()
+            if IMAGE_DRAFT:
+                # JPEG only: DCT scaling decodes straight to the smallest size
+                # still >= the display, so memory follows the display size
+                full_size = image.size
+                image.draft('RGB', (self.display_width, self.display_height))
+                if image.size != full_size:
+                    print(f"Decoding at {image.size[0]}x{image.size[1]}")
             
-            # Resize to fit display
-            resized_image = image_rgb.resize((self.display_width, self.display_height), 
-                                           Image.Resampling.LANCZOS)
+            # Resize to fit display and convert to RGB565
+            converter = RGB565Converter(self.display_width, self.display_height,
+                                        resize=IMAGE_RESIZE_BACKEND, resample=IMAGE_RESAMPLE,
+                                        reducing_gap=IMAGE_REDUCING_GAP)
+            self.image_data = converter.convert(image)
+            image.close()
             
-            # Convert to RGB565
-            self.image_data = self.rgb_to_rgb565(resized_image)
+            if cache:
+                cache.store(cache_key, self.display_width, self.display_height, self.rotation,
+                            [self.image_data], [self.display_duration()])
             
             dual_print("\nImage processed successfully")
             
@@ -42,18 +67,24 @@ class ImageHandler:
             dual_print(f"\nError loading image: {e}")
             raise
     
-    def rgb_to_rgb565(self, image):
-        """Convert PIL Image to RGB565 byte array"""
-        rgb_array = np.array(image, dtype=np.uint16)
-        
-        r = (rgb_array[:,:,0] >> 3) & 0x1F
-        g = (rgb_array[:,:,1] >> 2) & 0x3F  
-        b = (rgb_array[:,:,2] >> 3) & 0x1F
-        
-        rgb565 = ((r << 11) | (g << 5) | b)
-        rgb565_bytes = rgb565.byteswap().tobytes()
-        
-        return rgb565_bytes
+    def _open_cache(self):
+        """Return (FrameCache, key) for this image, or (None, None) if caching is off"""
+        if not FRAME_CACHE_ENABLED:
+            return None, None
+        try:
+            cache = FrameCache()
+            key = cache.key(self.image_path, self.display_width, self.display_height,
+                            self.rotation, f"image|{IMAGE_RESIZE_BACKEND}|{IMAGE_RESAMPLE}|"
+                            f"{IMAGE_REDUCING_GAP}|{IMAGE_DRAFT}")
+            return cache, key
+        except OSError as e:
+            print(f"Frame cache unavailable: {e}")
+            return None, None
+    
+    def is_cached(self):
+        """Whether this image's converted frame is in the frame cache"""
+        cache, cache_key = self._open_cache()
+        return cache is not None and os.path.exists(cache.path(cache_key))
     
     def get_image_data(self):
         """Get the prepared image data"""
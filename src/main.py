@@ -11,31 +11,379 @@ sys.path.insert(0, current_dir)
 
 # Import our dual output system
 from display_output import init_output, printf, display_print, dual_print
+from metrics import metrics
+from transitions import Transitions, TRANSITION_STYLES, TRANSITION_STYLE
 
-def main():
-    # Initialize dual output system
-    output = init_output(rotation='portrait')
+def play_frames(dispatcher, sender, scheduler, deadline=None, max_frames=None, trace=None):
+    """Play frames until the monotonic deadline or frame limit (default: forever)
+    
+    Returns True when the content has nothing further to show (a static
+    image that has been displayed, or content that failed to decode),
+    False when a limit was reached. A
+    StartupTrace is completed and reported once the first frame is on the panel.
+    """
+    frames = 0
+    while deadline is None or time.monotonic() < deadline:
+        if max_frames is not None and frames >= max_frames:
+            return False
+        
+        # More than one frame behind: skip frames (cheaply, where the handler can)
+        while scheduler.behind():
+            skipped = dispatcher.skip_frame()
+            if skipped is None:
+                break
+            scheduler.drop(skipped)
+            frames += 1
+        
+        start = time.perf_counter()
+        frame_data, duration = dispatcher.get_next_frame()
+        metrics.observe('handler', time.perf_counter() - start)
+        
+        if frame_data is not None and sender:
+            sender.submit(frame_data)
+            scheduler.presented(duration)
+            frames += 1
+            
+            if trace:
+                sender.flush()
+                trace.mark('first frame sent')
+                trace.report()
+                trace = None
+            
+            # Show progress in terminal only
+            if scheduler.frames_presented % 20 == 0:
+                fields = f" - fields/s: {sender.field_rate():.1f}" if sender.interlace else ""
+                printf(f"[TERMINAL] Frame {scheduler.frames_presented} - FPS: {scheduler.fps():.1f}{fields} - "
+                       f"dropped: {scheduler.frames_dropped} - "
+                       f"jitter: {scheduler.mean_jitter() * 1000:.1f}ms "
+                       f"(max {scheduler.max_jitter() * 1000:.1f}ms)")
+            
+            scheduler.wait()
+        else:
+            # No more data (for static images or end of text)
+            if dispatcher.get_file_type() == 'image':
+                return True
+            if not dispatcher.is_supported():
+                printf(f"\n[TERMINAL] Playback stopped: {dispatcher.file_path} could not be decoded")
+                return True
+            time.sleep(0.1)
+            scheduler.reset()
+    return False
+
+def transition_in(dispatcher, sender, scheduler, transitions, trace=None):
+    """Animate from what the panel shows to the dispatcher's first frame
+    
+    The first frame is then counted as presented, so play_frames carries
+    on from the second one. A StartupTrace is completed once the first
+    step is on the panel. Returns whether a frame was shown.
+    """
+    frame_data, duration = dispatcher.get_next_frame()
+    if frame_data is None:
+        return False
+    sender.flush()
+    
+    def first_step():
+        trace.mark('first frame sent')
+        trace.report()
+    transitions.run(frame_data, on_first_step=first_step if trace else None)
+    scheduler.reset()
+    scheduler.presented(duration)
+    scheduler.wait()
+    return True
+
+def run_playlist(source, output, transition=None):
+    """Rotate through a directory, glob or manifest with gapless transitions"""
+    from playlist import Playlist, load_playlist
+    from frame_sender import FrameSender
+    from frame_scheduler import FrameScheduler
+    
+    items, repeat = load_playlist(source)
+    if not items:
+        dual_print(f"\nOops! : No playable files in playlist: {source}")
+        return
+    dual_print(f"\nPlaylist: {len(items)} items from {source}")
+    
+    display_width = output.display.width if output.display else 320
+    display_height = output.display.height if output.display else 240
+    rotation = output.display.rotation if output.display else 0
+    
+    playlist = Playlist(items, display_width, display_height, rotation, repeat)
+    sender = FrameSender(output.display) if output.display else None
+    scheduler = FrameScheduler()
+    transitions = Transitions(output.display, transition) if output.display and transition else None
+    
+    # Handler load messages would overwrite the media on the panel
+    output.pause_display()
+    unplayable = 0
+    try:
+        while True:
+            item, dispatcher = playlist.advance()
+            if item is None:
+                break
+            if dispatcher is None or not dispatcher.is_supported():
+                printf(f"\n[PLAYLIST] Skipping unsupported item: {item.path}")
+                unplayable += 1
+                if unplayable >= len(items):
+                    # A whole pass with nothing to show - repeating would only spin
+                    dual_print(f"\nOops! : Nothing in the playlist could be played: {source}")
+                    break
+                continue
+            unplayable = 0
+            
+            printf(f"\n[PLAYLIST] Now playing: {item.path}")
+            deadline = time.monotonic() + item.duration if item.duration else None
+            max_frames = None
+            if item.loops:
+                count = dispatcher.handler.get_frame_count() if hasattr(dispatcher.handler, 'get_frame_count') else 1
+                max_frames = item.loops * max(count, 1)
+            if deadline is None and max_frames is None:
+                deadline = time.monotonic()
+            
+            if sender:
+                sender.interlace = dispatcher.interlaced()
+            scheduler.reset()
+            if transitions:
+                transition_in(dispatcher, sender, scheduler, transitions)
+            if play_frames(dispatcher, sender, scheduler, deadline, max_frames) and deadline \
+                    and dispatcher.is_supported():
+                # Static content: hold it until the item's time is up
+                time.sleep(max(deadline - time.monotonic(), 0))
+    finally:
+        if sender:
+            sender.close()
+        playlist.cleanup()
+        output.resume_display()
+
+def run_panels(output, default_source, sources, follow=False):
+    """Play content on every panel at once
+    
+    Each panel shows its --panel NAME=PATH file, else the 'source' from its
+    PANELS entry, else default_source. Panels showing the same file at the
+    same size share one dispatcher, so it is decoded and rendered once;
+    every content stream is paced on its own thread.
+    """
+    import threading
+    from file_dispatcher import FileDispatcher
+    from frame_sender import FrameSender, FrameSenderGroup
+    from frame_scheduler import FrameScheduler
+    from display_config import PANELS
+    
+    groups = {}
+    for index, (display, name) in enumerate(zip(output.panels, output.panel_names)):
+        config = PANELS[index] if index < len(PANELS) else {}
+        path = sources.get(name) or config.get('source') or default_source
+        if not path:
+            printf(f"\n[PANELS] {name}: nothing to show")
+            continue
+        groups.setdefault((path, display.width, display.height), []).append((name, display))
+    
+    # Handler load messages would overwrite the media on the console panel
+    output.pause_display()
+    dispatchers = []
+    senders = []
+    threads = []
+    try:
+        for (path, width, height), panels in groups.items():
+            names = ', '.join(name for name, _ in panels)
+            dispatcher = FileDispatcher(path, width, height, panels[0][1].rotation, follow=follow)
+            dispatchers.append(dispatcher)
+            if not dispatcher.is_supported():
+                printf(f"\n[PANELS] {names}: unsupported file {path}")
+                continue
+            printf(f"\n[PANELS] {names}: {path}")
+            
+            sender = FrameSenderGroup([FrameSender(display, interlace=dispatcher.interlaced())
+                                       for _, display in panels])
+            senders.append(sender)
+            thread = threading.Thread(target=play_frames, args=(dispatcher, sender, FrameScheduler()),
+                                      name=f"play-{names}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+        if threads:
+            # Everything was static: leave it up for a while, as for a single image
+            dual_print("\nImage display completed")
+            time.sleep(5)
+    finally:
+        for sender in senders:
+            sender.close()
+        for dispatcher in dispatchers:
+            dispatcher.cleanup()
+
+def run_layout(output, file_path, follow=False):
+    """Split-screen playback: media, console and status regions from LAYOUT_REGIONS
+    
+    Runs until interrupted, since the console and status bar stay live
+    after static content has been shown.
+    """
+    import threading
+    from compositor import Compositor
+    from file_dispatcher import FileDispatcher
+    from frame_scheduler import FrameScheduler
+    from display_config import LAYOUT_REGIONS
     
+    compositor = Compositor(output.display)
+    # Console text goes to the console region instead of the whole screen
+    output.pause_display()
+    schedulers = []
+    dispatchers = []
+    threads = []
+    
+    def console_lines():
+        return output.lines + [output.current_line] if output.current_line else list(output.lines)
+    
+    def status_text():
+        fps = f"{schedulers[0].fps():.1f} fps" if schedulers else "no media"
+        return f"{time.strftime('%H:%M:%S')}  {fps}  {os.path.basename(file_path or '')}"
+    
+    try:
+        for spec in LAYOUT_REGIONS:
+            name, source = spec['name'], spec['source']
+            rect = (spec['x'], spec['y'], spec['width'], spec['height'])
+            if source == 'media':
+                region = compositor.add_media(name, *rect)
+                if not file_path:
+                    continue
+                dispatcher = FileDispatcher(file_path, region.width, region.height,
+                                            output.display.rotation, follow=follow)
+                dispatchers.append(dispatcher)
+                if not dispatcher.is_supported():
+                    dual_print(f"\nOops! :Unsupported format: {os.path.basename(file_path)}")
+                    continue
+                scheduler = FrameScheduler()
+                schedulers.append(scheduler)
+                threads.append(threading.Thread(target=play_frames, args=(dispatcher, region, scheduler),
+                                                name=f"region-{name}", daemon=True))
+            elif source == 'console':
+                compositor.add_text(name, *rect, console_lines, spec.get('rate', 4))
+            elif source == 'status':
+                compositor.add_status(name, *rect, status_text, spec.get('rate', 2))
+            else:
+                raise ValueError(f"Unknown region source: {source}")
+        
+        compositor.start()
+        for thread in threads:
+            thread.start()
+        dual_print("\nLayout: " + ', '.join(compositor.regions) + " - Ctrl+C to exit")
+        while True:
+            time.sleep(1)
+    finally:
+        compositor.stop()
+        printf(f"\n[LAYOUT] Region updates - {compositor.report()}")
+        for dispatcher in dispatchers:
+            dispatcher.cleanup()
+
+def finish_metrics():
+    """Write the final metrics export and print the per-stage summary"""
+    metrics.stop_export()
+    if metrics.enabled:
+        printf(metrics.report())
+
+def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='\nDisplay files on TFT screen')
     parser.add_argument('file_path', nargs='?', default=None, 
                        help='\nPath to file to display (GIF, image, video, or text)')
+    parser.add_argument('--backend', choices=['spidev', 'sim'], default=None,
+                       help='\nPanel bus: real spidev hardware or the simulated framebuffer')
+    parser.add_argument('--follow', action='store_true',
+                       help='\nFollow a growing text/log file (like tail -f)')
+    parser.add_argument('--playlist', default=None,
+                       help='\nDirectory, glob pattern or JSON manifest to rotate through')
+    parser.add_argument('--fast-start', action='store_true',
+                       help='\nRe-attach to an already initialized panel and skip demo/loading screens')
+    parser.add_argument('--startup-trace', action='store_true',
+                       help='\nReport how long each startup stage took')
+    parser.add_argument('--panel', action='append', default=[], metavar='NAME=PATH',
+                       type=lambda value: value.split('=', 1),
+                       help='\nFile for one panel when several are configured (repeatable)')
+    parser.add_argument('--layout', action='store_true',
+                       help='\nSplit the screen into media, console and status regions (LAYOUT_REGIONS)')
+    parser.add_argument('--transition', default=TRANSITION_STYLE or 'none',
+                       choices=('none',) + TRANSITION_STYLES,
+                       help='\nEffect when switching to new content')
+    parser.add_argument('--metrics', default=None, metavar='PATH',
+                       help='\nExport per-stage latencies to PATH (JSON lines, or Prometheus textfile for .prom)')
+    parser.add_argument('--metrics-interval', type=float, default=None,
+                       help='\nSeconds between metrics exports')
     
     args = parser.parse_args()
     file_path = args.file_path
+    transition = None if args.transition == 'none' else args.transition
+    if any(len(entry) != 2 for entry in args.panel):
+        parser.error("--panel takes NAME=PATH")
+    
+    if args.metrics:
+        metrics.start_export(args.metrics, args.metrics_interval)
+        printf(f"\nMetrics: exporting to {args.metrics}")
+    
+    trace = None
+    if args.startup_trace:
+        from startup_trace import StartupTrace
+        trace = StartupTrace()
+    
+    # Initialize dual output system
+    output = init_output(rotation='portrait', backend=args.backend, warm=args.fast_start)
+    if trace:
+        trace.mark('display init')
+    
+    if args.fast_start:
+        # Straight to content: no console redraws before the first frame
+        output.pause_display()
+    else:
+        # Demonstrate the different print functions
+        printf("\n=== TERMINAL ONLY ===")
+        printf("\nThis message only appears in terminal")
+        printf("\n")
+        
+        display_print("\n=== DISPLAY ONLY ===\n")
+        display_print("\nThis message only appears on TFT display")
+        display_print("\n")
+        
+        dual_print("\n=== BOTH TERMINAL & DISPLAY ===")
+        dual_print("\nThis message appears in both places!")
+        dual_print("\n")
     
-    # Demonstrate the different print functions
-    printf("\n=== TERMINAL ONLY ===")
-    printf("\nThis message only appears in terminal")
-    printf("\n")
+    # Playlist mode: explicit, or a directory/glob/manifest given as the file
+    playlist_source = args.playlist
+    if not playlist_source and file_path:
+        from playlist import is_playlist_source
+        if is_playlist_source(file_path):
+            playlist_source = file_path
+    if playlist_source:
+        try:
+            run_playlist(playlist_source, output, transition)
+        except KeyboardInterrupt:
+            dual_print("\nExiting...")
+        finally:
+            output.cleanup()
+            finish_metrics()
+        return
     
-    display_print("\n=== DISPLAY ONLY ===\n")
-    display_print("\nThis message only appears on TFT display")
-    display_print("\n")
+    # Split screen: regions with their own sources and rates
+    if args.layout:
+        try:
+            run_layout(output, file_path, args.follow)
+        except KeyboardInterrupt:
+            dual_print("\nExiting...")
+        finally:
+            output.cleanup()
+            finish_metrics()
+        return
     
-    dual_print("\n=== BOTH TERMINAL & DISPLAY ===")
-    dual_print("\nThis message appears in both places!")
-    dual_print("\n")
+    # Several panels: each plays its own content (or shares one)
+    if len(output.panels) > 1:
+        try:
+            run_panels(output, file_path, dict(args.panel), args.follow)
+        except KeyboardInterrupt:
+            dual_print("\nExiting...")
+        finally:
+            output.cleanup()
+            finish_metrics()
+        return
     
     # File loading logic
     if not file_path:
@@ -60,18 +408,26 @@ def main():
     
     try:
         from file_dispatcher import FileDispatcher
+        from frame_sender import FrameSender
+        from frame_scheduler import FrameScheduler
         
         dual_print(f"\nLoading file: {file_path}")
         
         # Get display dimensions
         display_width = output.display.width if output.display else 320
         display_height = output.display.height if output.display else 240
+        rotation = output.display.rotation if output.display else 0
         
         dispatcher = FileDispatcher(file_path, 
                                   display_width=display_width, 
-                                  display_height=display_height)
+                                  display_height=display_height,
+                                  rotation=rotation,
+                                  follow=args.follow)
+        if trace:
+            trace.mark('handler loaded')
         
         if not dispatcher.is_supported():
+            output.resume_display()
             error_msg = f"\nOops! :Unsupported format: {os.path.basename(file_path)}"
             dual_print(error_msg)
             
@@ -90,46 +446,35 @@ def main():
         dual_print(f"\nFile type: {file_type}")
         dual_print("\nDisplaying file... Press Ctrl+C to exit")
         
-        # Show loading message on display
-        display_print("=" * 30)
-        display_print("\nLOADING FILE")
-        display_print("=" * 30)
-        display_print(f"\nType: {file_type.upper()}")
-        display_print(f"\nFile: {os.path.basename(file_path)}")
-        display_print("\nStarting playback...")
+        if not args.fast_start:
+            # Show loading message on display
+            display_print("=" * 30)
+            display_print("\nLOADING FILE")
+            display_print("=" * 30)
+            display_print(f"\nType: {file_type.upper()}")
+            display_print(f"\nFile: {os.path.basename(file_path)}")
+            display_print("\nStarting playback...")
+        
+            time.sleep(2)  # Show loading message for 2 seconds
         
-        time.sleep(2)  # Show loading message for 2 seconds
+        # Frames go out on a transmit thread while the next one is decoded
+        # Bus-bound file types can go out as alternating half-frame fields
+        sender = FrameSender(output.display, interlace=dispatcher.interlaced()) if output.display else None
+        if sender and sender.interlace:
+            dual_print("\nInterlaced: sending alternating even/odd row fields")
         
-        display_count = 0
-        start_time = time.time()
+        # Deadlines follow the content timeline; late frames are skipped
+        scheduler = FrameScheduler()
         
-        while True:
-            frame_start = time.time()
-            
-            frame_data, duration = dispatcher.get_next_frame()
-            
-            if frame_data and output.display:
-                output.display.display_image(frame_data)
-                display_count += 1
-                
-                # Calculate sleep time
-                sleep_time = max(duration / 1000.0 - (time.time() - frame_start), 0.01)
-                
-                # Show progress in terminal only
-                if display_count % 20 == 0:
-                    current_time = time.time()
-                    fps = display_count / (current_time - start_time)
-                    printf(f"[TERMINAL] Frame {display_count} - FPS: {fps:.1f}")
-                
-                time.sleep(sleep_time)
-            else:
-                # No more data (for static images or end of text)
-                if file_type == 'image':
-                    dual_print("\nImage display completed")
-                    time.sleep(5)
-                    break
-                else:
-                    time.sleep(0.1)
+        if sender and transition and not args.fast_start:
+            # From the loading screen into the content (--fast-start cuts straight to it)
+            if transition_in(dispatcher, sender, scheduler, Transitions(output.display, transition),
+                             trace=trace):
+                trace = None
+        
+        if play_frames(dispatcher, sender, scheduler, trace=trace) and dispatcher.is_supported():
+            dual_print("\nImage display completed")
+            time.sleep(5)
             
     except KeyboardInterrupt:
         dual_print("\nExiting...")
@@ -138,10 +483,13 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        if 'sender' in locals() and sender:
+            sender.close()
         if 'dispatcher' in locals():
             dispatcher.cleanup()
         if output:
             output.cleanup()
+        finish_metrics()
         dual_print("\nCleanup complete")
 
 if __name__ == "__main__":
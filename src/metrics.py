@@ -0,0 +1,163 @@
+import json
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import METRICS_ENABLED, METRICS_WINDOW, METRICS_INTERVAL
+
+QUANTILES = (50, 95, 99)
+
+class RollingHistogram:
+    """The last `size` durations of one stage, for percentiles
+
+    Recording is a single store into a preallocated ring; percentiles are
+    only computed when exported. Several threads (decoder, sender, panels)
+    can record the same stage, so updates take the histogram's own lock.
+    """
+
+    def __init__(self, size=METRICS_WINDOW):
+        self.samples = np.zeros(size)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.samples[self.count % len(self.samples)] = seconds
+            self.count += 1
+            self.total += seconds
+
+    def summary(self):
+        """count, mean and p50/p95/p99 over the window, in milliseconds"""
+        with self._lock:
+            count, total = self.count, self.total
+            samples = self.samples[:min(count, len(self.samples))].copy()
+        if not count:
+            return {'count': 0}
+        values = np.percentile(samples, QUANTILES) * 1000
+        result = {'count': count, 'mean_ms': total / count * 1000}
+        result.update({f'p{q}_ms': float(v) for q, v in zip(QUANTILES, values)})
+        return result
+
+class Metrics:
+    """Per-stage latency histograms and counters for the playback pipeline
+
+    Stages time themselves with time.perf_counter() and call observe();
+    everything is a no-op until enabled. Exports go to a JSON-lines file
+    or a Prometheus textfile-collector file on a fixed interval.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._export_thread = None
+        self._export_path = None
+        self._stop = threading.Event()
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, RollingHistogram())
+        histogram.observe(seconds)
+
+    def inc(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        return {
+            'time': time.time(),
+            'counters': counters,
+            'stages': {stage: h.summary() for stage, h in sorted(histograms.items())},
+        }
+
+    def to_prometheus(self, snapshot=None):
+        snapshot = snapshot or self.snapshot()
+        lines = ['# TYPE rpi_display_stage_seconds summary']
+        for stage, s in snapshot['stages'].items():
+            if not s['count']:
+                continue
+            for q in QUANTILES:
+                lines.append(f'rpi_display_stage_seconds{{stage="{stage}",quantile="{q / 100}"}} '
+                             f'{s[f"p{q}_ms"] / 1000:.6f}')
+            lines.append(f'rpi_display_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+            lines.append(f'rpi_display_stage_seconds_sum{{stage="{stage}"}} '
+                         f'{s["mean_ms"] * s["count"] / 1000:.6f}')
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f'# TYPE rpi_display_{name}_total counter')
+            lines.append(f'rpi_display_{name}_total {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, fmt=None):
+        """Append a JSON line, or atomically replace a Prometheus textfile (.prom)"""
+        fmt = fmt or ('prometheus' if path.endswith('.prom') else 'jsonl')
+        snapshot = self.snapshot()
+        if fmt == 'prometheus':
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(self.to_prometheus(snapshot))
+            os.replace(tmp_path, path)
+        else:
+            with open(path, 'a') as f:
+                f.write(json.dumps(snapshot) + '\n')
+
+    def start_export(self, path, interval=None, fmt=None):
+        """Enable collection and export every interval seconds on a background thread"""
+        self.enabled = True
+        interval = interval or METRICS_INTERVAL
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.write(path, fmt)
+                except OSError as e:
+                    print(f"Metrics export failed: {e}")
+
+        self._stop.clear()
+        self._export_path = (path, fmt)
+        self._export_thread = threading.Thread(target=run, name='metrics-export', daemon=True)
+        self._export_thread.start()
+
+    def stop_export(self):
+        """Stop exporting, writing one final snapshot"""
+        if self._export_thread:
+            self._stop.set()
+            self._export_thread.join(timeout=2.0)
+            self._export_thread = None
+            try:
+                self.write(*self._export_path)
+            except OSError as e:
+                print(f"Metrics export failed: {e}")
+
+    def report(self):
+        """Per-stage summary table for the terminal"""
+        snapshot = self.snapshot()
+        lines = ["[METRICS] stage            count    p50 ms   p95 ms   p99 ms"]
+        for stage, s in snapshot['stages'].items():
+            if s['count']:
+                lines.append(f"[METRICS] {stage:<14} {s['count']:7d} {s['p50_ms']:9.2f} "
+                             f"{s['p95_ms']:8.2f} {s['p99_ms']:8.2f}")
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f"[METRICS] {name}: {value}")
+        return '\n'.join(lines)
+
+# Global instance
+metrics = Metrics()
@@ -0,0 +1,55 @@
+from frame_file import MappedFrames
+
+class NativeHandler:
+    """Play a pre-rendered .r565 frame file straight from mmap - no decoding"""
+
+    def __init__(self, file_path, display_width=320, display_height=240, rotation=0):
+        self.file_path = file_path
+        self.display_width = display_width
+        self.display_height = display_height
+        self.rotation = rotation
+        self.frames = None
+        self.durations = []
+        self.current_frame = 0
+        self.load_file()
+
+    def load_file(self):
+        """Map the frame file and check it was rendered for this display"""
+        try:
+            self.frames = MappedFrames(self.file_path)
+            if (self.frames.width, self.frames.height) != (self.display_width, self.display_height):
+                raise ValueError(f"Rendered for {self.frames.width}x{self.frames.height}, "
+                                 f"display is {self.display_width}x{self.display_height}")
+            if self.rotation and self.frames.rotation and self.frames.rotation != self.rotation:
+                print(f"Warning: rendered for rotation 0x{self.frames.rotation:02X}, "
+                      f"display uses 0x{self.rotation:02X}")
+            self.durations = self.frames.durations
+            print(f"Native file: {len(self.frames)} frames, "
+                  f"{self.frames.width}x{self.frames.height}, codec {self.frames.codec}")
+        except Exception as e:
+            print(f"Error loading native file: {e}")
+            raise
+
+    def get_next_frame(self):
+        """Get next frame and its duration"""
+        if not self.durations:
+            return None, 100
+        frame_data = self.frames[self.current_frame]
+        duration = self.durations[self.current_frame]
+        self.current_frame = (self.current_frame + 1) % len(self.durations)
+        return frame_data, duration
+
+    def skip_frame(self):
+        """Advance one frame without touching its pixels"""
+        if not self.durations:
+            return None
+        duration = self.durations[self.current_frame]
+        self.current_frame = (self.current_frame + 1) % len(self.durations)
+        return duration
+
+    def get_frame_count(self):
+        return len(self.durations)
+
+    def cleanup(self):
+        if self.frames:
+            self.frames.close()
@@ -0,0 +1,138 @@
+import glob
+import json
+import os
+import sys
+import threading
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import PLAYLIST_DEFAULT_DURATION
+from file_dispatcher import FileDispatcher, detect_file_type
+
+class PlaylistItem:
+    """One entry: a file, how long to show it (seconds) and/or how many loops"""
+
+    def __init__(self, path, duration=None, loops=None):
+        self.path = path
+        self.duration = duration
+        self.loops = loops
+        if duration is None and loops is None:
+            self.duration = PLAYLIST_DEFAULT_DURATION
+
+    def __repr__(self):
+        return f"PlaylistItem({self.path!r}, duration={self.duration}, loops={self.loops})"
+
+def is_playlist_source(source):
+    """True for a directory, a glob pattern or a .json manifest"""
+    return (os.path.isdir(source) or source.lower().endswith('.json')
+            or any(c in source for c in '*?['))
+
+def load_playlist(source):
+    """Build (items, repeat) from a directory, glob pattern or JSON manifest
+
+    A manifest is either a list of entries or {"items": [...], "repeat": bool};
+    each entry is a path or {"path": ..., "duration": seconds, "loops": n}.
+    Relative paths are resolved against the manifest's directory.
+    """
+    if source.lower().endswith('.json') and os.path.isfile(source):
+        with open(source) as f:
+            manifest = json.load(f)
+        base = os.path.dirname(os.path.abspath(source))
+        entries = manifest.get('items', []) if isinstance(manifest, dict) else manifest
+        repeat = manifest.get('repeat', True) if isinstance(manifest, dict) else True
+
+        items = []
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {'path': entry}
+            path = entry['path']
+            if not os.path.isabs(path):
+                path = os.path.join(base, path)
+            items.append(PlaylistItem(path, entry.get('duration'), entry.get('loops')))
+        return items, repeat
+
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in sorted(os.listdir(source))]
+    else:
+        paths = sorted(glob.glob(source))
+    paths = [p for p in paths if os.path.isfile(p) and detect_file_type(p) != 'unsupported']
+    return [PlaylistItem(p) for p in paths], True
+
+class Playlist:
+    """Rotates through items, building the next item's dispatcher in the background
+
+    At most one item is preloaded at a time, so memory is bounded by the
+    current item plus the next one.
+    """
+
+    def __init__(self, items, display_width, display_height, rotation=0, repeat=True):
+        if not items:
+            raise ValueError("Playlist is empty")
+        self.items = items
+        self.display_width = display_width
+        self.display_height = display_height
+        self.rotation = rotation
+        self.repeat = repeat
+
+        self.index = -1
+        self.item = None
+        self.dispatcher = None
+        self._preload_thread = None
+        self._preloaded = None
+        self._preload(0)
+
+    def _build(self, index):
+        item = self.items[index]
+        dispatcher = FileDispatcher(item.path, self.display_width, self.display_height, self.rotation)
+        self._preloaded = (index, dispatcher)
+
+    def _preload(self, index):
+        self._preloaded = None
+        self._preload_thread = threading.Thread(target=self._build, args=(index,),
+                                                name='playlist-preload', daemon=True)
+        self._preload_thread.start()
+
+    def _next_index(self):
+        index = self.index + 1
+        if index >= len(self.items):
+            return 0 if self.repeat else None
+        return index
+
+    def advance(self):
+        """Switch to the next item; returns (item, dispatcher) or (None, None) at the end"""
+        if self._next_index() is None:
+            return None, None
+
+        # Normally already loaded while the current item played
+        self._preload_thread.join()
+        preloaded = self._preloaded
+        if self.dispatcher:
+            self.dispatcher.cleanup()
+        if preloaded is None:
+            # Preload failed - skip ahead
+            self.index = self._next_index()
+            self.dispatcher = None
+        else:
+            self.index, self.dispatcher = preloaded
+        self.item = self.items[self.index]
+
+        following = self._next_index()
+        if following is not None:
+            self._preload(following)
+        else:
+            self._preloaded = None
+        return self.item, self.dispatcher
+
+    def cleanup(self):
+        if self._preload_thread:
+            self._preload_thread.join(timeout=5.0)
+        if self._preloaded:
+            self._preloaded[1].cleanup()
+            self._preloaded = None
+        if self.dispatcher:
+            self.dispatcher.cleanup()
+            self.dispatcher = None
@@ -0,0 +1,152 @@
+import time
+import numpy as np
+
+from metrics import metrics
+
+# Resize backends selectable per use
+RESIZE_BACKENDS = ('cv2_area', 'cv2_nearest', 'pil_lanczos')
+
+# Filters for the PIL backend (resample=)
+PIL_RESAMPLE_FILTERS = ('nearest', 'bilinear', 'bicubic', 'lanczos')
+
+_cv2 = None
+
+def _import_cv2():
+    """Import OpenCV on first use (it is slow to import and optional)"""
+    global _cv2
+    if _cv2 is None:
+        import cv2
+        _cv2 = cv2
+    return _cv2
+
+def pack_rgb565(pixels, out, scratch=None, channel_order='rgb'):
+    """Pack an (h, w, 3) uint8 RGB/BGR array into out as big-endian RGB565
+
+    out is an (h, w, 2) uint8 array; all arithmetic stays in uint8 and writes
+    into out, so nothing is allocated when scratch is supplied.
+    """
+    if channel_order == 'bgr':
+        r, g, b = pixels[..., 2], pixels[..., 1], pixels[..., 0]
+    else:
+        r, g, b = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    if scratch is None:
+        scratch = np.empty(pixels.shape[:2], dtype=np.uint8)
+    hi = out[..., 0]
+    lo = out[..., 1]
+
+    # High byte: RRRRRGGG
+    np.bitwise_and(r, 0xF8, out=hi)
+    np.right_shift(g, 5, out=scratch)
+    np.bitwise_or(hi, scratch, out=hi)
+
+    # Low byte: GGGBBBBB
+    np.bitwise_and(g, 0x1C, out=lo)
+    np.left_shift(lo, 3, out=lo)
+    np.right_shift(b, 3, out=scratch)
+    np.bitwise_or(lo, scratch, out=lo)
+    return out
+
+def rgb_to_rgb565(image, channel_order='rgb'):
+    """Convert a display-sized PIL Image or array to big-endian RGB565 bytes"""
+    pixels = np.asarray(image.convert('RGB') if hasattr(image, 'convert') and image.mode != 'RGB' else image)
+    out = np.empty(pixels.shape[:2] + (2,), dtype=np.uint8)
+    return pack_rgb565(pixels, out, channel_order=channel_order).tobytes()
+
+class RGB565Converter:
+    """Fused resize + RGB565 packing into preallocated output buffers
+
+    convert() returns one of `buffers` reusable (height, width, 2) uint8
+    arrays, rotating between them, so a caller that keeps at most
+    buffers-1 frames in flight never sees its data overwritten.
+    """
+
+    def __init__(self, width, height, channel_order='rgb', resize='cv2_area', buffers=1,
+                 resample='lanczos', reducing_gap=None):
+        if resize not in RESIZE_BACKENDS:
+            raise ValueError(f"Unknown resize backend: {resize}")
+        if resample not in PIL_RESAMPLE_FILTERS:
+            raise ValueError(f"Unknown resample filter: {resample}")
+        if resize.startswith('cv2'):
+            try:
+                _import_cv2()
+            except ImportError:
+                print(f"OpenCV not available, using pil_lanczos instead of {resize}")
+                resize = 'pil_lanczos'
+
+        self.width = width
+        self.height = height
+        self.channel_order = channel_order
+        self.resize = resize
+        # PIL backend only: filter name and Image.resize reducing_gap
+        self.resample = resample
+        self.reducing_gap = reducing_gap
+        self.shape = (height, width, 2)
+
+        self._buffers = [self.new_buffer() for _ in range(max(buffers, 1))]
+        self._next = 0
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._scratch = np.empty((height, width), dtype=np.uint8)
+
+    def new_buffer(self):
+        """Allocate an output buffer the caller can keep"""
+        return np.empty(self.shape, dtype=np.uint8)
+
+    def convert(self, image, out=None):
+        """Resize image to the display and pack it as big-endian RGB565
+
+        image is a PIL Image or an (h, w, 3) uint8 array in this converter's
+        channel order. Returns out, or the next internal buffer.
+        """
+        if out is None:
+            out = self._buffers[self._next]
+            self._next = (self._next + 1) % len(self._buffers)
+
+        start = time.perf_counter()
+        pixels, order = self._resize(image)
+        resized = time.perf_counter()
+        pack_rgb565(pixels, out, self._scratch, order)
+        metrics.observe('resize', resized - start)
+        metrics.observe('rgb565', time.perf_counter() - resized)
+        return out
+
+    def _resize(self, image):
+        """Return (pixels, channel_order) at display size"""
+        size = (self.width, self.height)
+
+        if self.resize == 'pil_lanczos':
+            from PIL import Image
+            if not isinstance(image, Image.Image):
+                pixels = np.asarray(image)
+                if self.channel_order == 'bgr':
+                    pixels = pixels[..., ::-1]
+                image = Image.fromarray(np.ascontiguousarray(pixels), 'RGB')
+            elif image.mode not in ('RGB', 'RGBA', 'L'):
+                image = image.convert('RGB')
+            if image.size != size:
+                resample = getattr(Image.Resampling, self.resample.upper())
+                image = image.resize(size, resample, reducing_gap=self.reducing_gap)
+            # Converting after the resize copies display-sized pixels, not the source
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            return np.asarray(image), 'rgb'
+
+        if hasattr(image, 'mode'):
+            # PIL input to an OpenCV backend: box-reduce large sources first so
+            # only a few times the display size is copied into numpy
+            if self.reducing_gap:
+                factor = int(min(image.size[0] / size[0], image.size[1] / size[1]) / self.reducing_gap)
+                if factor > 1:
+                    image = image.reduce(factor)
+            pixels = np.asarray(image if image.mode == 'RGB' else image.convert('RGB'))
+            order = 'rgb'
+        else:
+            pixels = image
+            order = self.channel_order
+
+        if pixels.shape[1] == self.width and pixels.shape[0] == self.height:
+            return pixels, order
+
+        cv2 = _import_cv2()
+        interpolation = cv2.INTER_AREA if self.resize == 'cv2_area' else cv2.INTER_NEAREST
+        cv2.resize(pixels, size, dst=self._resized, interpolation=interpolation)
+        return self._resized, order
@@ -0,0 +1,32 @@
+import os
+import time
+
+def process_age():
+    """Seconds since this process started (0.0 where /proc is not available)"""
+    try:
+        with open('/proc/self/stat') as f:
+            # Fields after the command name; starttime is field 22 of the full line
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK'), 0.0)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+class StartupTrace:
+    """Time each startup stage, measured from process start (for --startup-trace)"""
+
+    def __init__(self):
+        now = time.monotonic()
+        self.start = now - process_age()
+        self.marks = [('interpreter + imports', now)]
+
+    def mark(self, stage):
+        self.marks.append((stage, time.monotonic()))
+
+    def report(self):
+        print("\n[STARTUP] stage                     +ms     total ms")
+        previous = self.start
+        for stage, at in self.marks:
+            print(f"[STARTUP] {stage:<24} {(at - previous) * 1000:7.1f} {(at - self.start) * 1000:9.1f}")
+            previous = at
@@ -1,108 +1,346 @@
-from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 import os
+import sys
+import threading
+from collections import OrderedDict, deque
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import (TEXT_PAGE_CACHE_PAGES, TEXT_PAGE_DURATION, TEXT_FOLLOW_MAX_FPS,
+                            TEXT_FOLLOW_POLL_INTERVAL, TEXT_FOLLOW_TAIL_BYTES)
+from glyph_atlas import GlyphAtlas, load_mono_font
+
+LINE_HEIGHT = 15
+MARGIN = 10
+PAGE_INFO_COLOR = (128, 128, 128)
+INDEX_CHUNK = 1 << 20
 
 class TextHandler:
-    def __init__(self, text_path, display_width=320, display_height=240):
+    """Page through a text file of any size
+
+    Only a byte-offset index of the source lines is kept in memory. Pages
+    are found lazily by wrapping lines as they are reached, rendered on
+    demand, kept in a small LRU and the following page is rendered in the
+    background while the current one is shown.
+
+    With follow=True the file is tailed instead (like tail -f): only bytes
+    appended since the last read are decoded, and only the new lines are
+    drawn at the bottom of the screen.
+    """
+
+    def __init__(self, text_path, display_width=320, display_height=240, follow=False):
         self.text_path = text_path
         self.display_width = display_width
         self.display_height = display_height
-        self.lines = []
         self.current_page = 0
         self.lines_per_page = 0
-        self.load_text()
-    
+        self.line_offsets = np.zeros(0, dtype=np.int64)
+        self.atlas = GlyphAtlas(load_mono_font(), LINE_HEIGHT)
+        self.columns = max(self.atlas.columns(display_width - 2 * MARGIN), 1)
+
+        self._file = None
+        self._lock = threading.RLock()
+        self._page_starts = [(0, 0)]  # (source line, wrapped row) where each page begins
+        self._paginated = False
+        self._pages = OrderedDict()
+        self._prefetch_thread = None
+        self.follow = follow
+        self._watcher = None
+        if follow:
+            self.start_follow()
+        else:
+            self.load_text()
+
     def load_text(self):
-        """Load and prepare text for display"""
+        """Index line starts by streaming the file; nothing else is read up front"""
         try:
-            with open(self.text_path, 'r', encoding='utf-8', errors='ignore') as file:
-                content = file.read()
-            
-            # Split into lines that fit the display
-            self.lines = self.wrap_text(content, self.display_width - 20)  # 20px margin
-            self.lines_per_page = self.display_height // 15  # Approximate lines per page
-            
-            print(f"Text loaded: {len(self.lines)} lines, {self.lines_per_page} lines per page")
-            
+            self._file = open(self.text_path, 'rb')
+            chunks = [np.zeros(1, dtype=np.int64)]
+            position = 0
+            while True:
+                chunk = self._file.read(INDEX_CHUNK)
+                if not chunk:
+                    break
+                newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 0x0A)
+                chunks.append(newlines.astype(np.int64) + (position + 1))
+                position += len(chunk)
+            offsets = np.concatenate(chunks)
+            # A trailing newline does not start another line
+            self.line_offsets = offsets[offsets < position]
+
+            # Leave the bottom rows for the page indicator
+            self.lines_per_page = max(self.atlas.rows(self.display_height - 3 * MARGIN), 1)
+
+            print(f"Text loaded: {len(self.line_offsets)} lines ({position} bytes), "
+                  f"{self.lines_per_page} lines per page")
+
         except Exception as e:
             print(f"Error loading text file: {e}")
             raise
-    
-    def wrap_text(self, text, max_width):
-        """Wrap text to fit display width"""
-        # Simple character-based wrapping (font width approximation)
-        words = text.split()
-        lines = []
-        current_line = []
-        
-        for word in words:
-            # Approximate line length (rough estimation)
-            test_line = ' '.join(current_line + [word])
-            if len(test_line) * 8 <= max_width:  # Rough char width estimation
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                current_line = [word]
-        
-        if current_line:
-            lines.append(' '.join(current_line))
-        
-        return lines
-    
+
+    @property
+    def line_count(self):
+        return len(self.line_offsets)
+
+    def read_line(self, index):
+        """Source line by number, decoded and without its line ending"""
+        with self._lock:
+            self._file.seek(int(self.line_offsets[index]))
+            raw = self._file.readline()
+        return raw.decode('utf-8', errors='ignore').rstrip('\r\n')
+
+    def wrap_line(self, line):
+        """Wrap one source line to the display width, breaking at spaces where possible"""
+        line = line.expandtabs(4)
+        if len(line) <= self.columns:
+            return [line]
+
+        rows = []
+        while len(line) > self.columns:
+            cut = line.rfind(' ', 0, self.columns + 1)
+            if cut <= 0:
+                # No space to break at - split the word
+                cut = self.columns
+            rows.append(line[:cut].rstrip())
+            line = line[cut:].lstrip(' ')
+        if line:
+            rows.append(line)
+        return rows
+
+    def _paginate(self, page):
+        """Extend the page table until it covers page (or the end of the file)"""
+        with self._lock:
+            while len(self._page_starts) <= page and not self._paginated:
+                line, row = self._page_starts[-1]
+                remaining = self.lines_per_page
+                while remaining and line < self.line_count:
+                    available = len(self.wrap_line(self.read_line(line))) - row
+                    if available > remaining:
+                        row += remaining
+                        remaining = 0
+                    else:
+                        remaining -= available
+                        line += 1
+                        row = 0
+                if line >= self.line_count:
+                    self._paginated = True
+                    # Cached pages were drawn before the total was known
+                    self._pages.clear()
+                else:
+                    self._page_starts.append((line, row))
+
+    def get_frame_count(self):
+        """Number of pages (paginates the whole file the first time)"""
+        if self.follow:
+            return 1
+        if not self.line_count:
+            return 0
+        self._paginate(sys.maxsize)
+        return len(self._page_starts)
+
+    def _render(self, page):
+        """Compose a page into a new RGB565 frame"""
+        line, row = self._page_starts[page]
+        rows = []
+        while len(rows) < self.lines_per_page and line < self.line_count:
+            rows.extend(self.wrap_line(self.read_line(line))[row:])
+            line += 1
+            row = 0
+        rows = rows[:self.lines_per_page]
+
+        frame = np.empty((self.display_height, self.display_width, 2), dtype=np.uint8)
+        self.atlas.fill(frame)
+        self.atlas.draw_lines(frame, rows, MARGIN, MARGIN)
+
+        # Add page indicator (the total is shown once pagination has reached the end)
+        page_info = f"Page {page + 1}/{len(self._page_starts)}" if self._paginated else f"Page {page + 1}"
+        self.atlas.draw_text(frame, page_info, MARGIN, self.display_height - 2 * MARGIN,
+                             fg=PAGE_INFO_COLOR)
+        return frame
+
+    def get_page(self, page):
+        """Rendered page from the LRU, rendering it on a miss"""
+        with self._lock:
+            frame = self._pages.get(page)
+            if frame is not None:
+                self._pages.move_to_end(page)
+                return frame
+            self._paginate(page)
+            frame = self._render(page)
+            self._pages[page] = frame
+            while len(self._pages) > TEXT_PAGE_CACHE_PAGES:
+                self._pages.popitem(last=False)
+            return frame
+
+    def _prefetch(self, page):
+        """Render page in the background unless it is cached or a prefetch is running"""
+        if page in self._pages or (self._prefetch_thread and self._prefetch_thread.is_alive()):
+            return
+        self._prefetch_thread = threading.Thread(target=self.get_page, args=(page,),
+                                                 name='text-prefetch', daemon=True)
+        self._prefetch_thread.start()
+
+    def _next_page_number(self, page):
+        self._paginate(page + 1)
+        return page + 1 if page + 1 < len(self._page_starts) else 0
+
     def get_next_page(self):
         """Get next page of text as image data"""
-        if not self.lines:
-            return None, 5000  # 5 seconds per page
-        
-        start_idx = self.current_page * self.lines_per_page
-        end_idx = start_idx + self.lines_per_page
-        
-        if start_idx >= len(self.lines):
+        if self.follow:
+            return self._next_follow_frame()
+        if not self.line_count:
+            return None, TEXT_PAGE_DURATION
+
+        self._paginate(self.current_page)
+        if self.current_page >= len(self._page_starts):
             self.current_page = 0  # Loop back to beginning
-            start_idx = 0
-            end_idx = self.lines_per_page
-        
-        page_lines = self.lines[start_idx:end_idx]
-        
-        # Create image with text
-        image = Image.new('RGB', (self.display_width, self.display_height), color='black')
-        draw = ImageDraw.Draw(image)
-        
-        # Try to use default font, fallback to basic font
-        try:
-            font = ImageFont.load_default()
-        except:
-            font = None
-        
-        # Draw lines
-        y_position = 10
-        for line in page_lines:
-            draw.text((10, y_position), line, fill='white', font=font)
-            y_position += 15  # Line height
-        
-        # Add page indicator
-        total_pages = (len(self.lines) + self.lines_per_page - 1) // self.lines_per_page
-        page_info = f"Page {self.current_page + 1}/{total_pages}"
-        draw.text((10, self.display_height - 20), page_info, fill='gray', font=font)
-        
-        # Convert to RGB565
-        rgb565_data = self.rgb_to_rgb565(image)
-        
+
+        rgb565_data = self.get_page(self.current_page)
+
         # Move to next page
-        self.current_page += 1
-        
-        return rgb565_data, 5000  # 5 seconds per page
-    
-    def rgb_to_rgb565(self, image):
-        """Convert PIL Image to RGB565 byte array"""
-        rgb_array = np.array(image, dtype=np.uint16)
-        
-        r = (rgb_array[:,:,0] >> 3) & 0x1F
-        g = (rgb_array[:,:,1] >> 2) & 0x3F  
-        b = (rgb_array[:,:,2] >> 3) & 0x1F
-        
-        rgb565 = ((r << 11) | (g << 5) | b)
-        rgb565_bytes = rgb565.byteswap().tobytes()
-        
-        return rgb565_bytes
\ No newline at end of file
+        self.current_page = self._next_page_number(self.current_page)
+        self._prefetch(self.current_page)
+
+        return rgb565_data, TEXT_PAGE_DURATION
+
+    # ---- follow mode ----
+
+    def start_follow(self):
+        """Open the file at its tail and start watching it"""
+        from file_watcher import FileWatcher
+
+        self.lines_per_page = max(self.atlas.rows(self.display_height - 3 * MARGIN), 1)
+        self.frame = np.empty((self.display_height, self.display_width, 2), dtype=np.uint8)
+        self.atlas.fill(self.frame)
+        self._tail = deque(maxlen=self.lines_per_page)
+        self._lines_seen = 0
+        self._inode = None
+        self._offset = 0
+        self._partial = b''
+        self._skip_partial = False
+        self._follow_redraw = True
+        self._last_refresh = 0.0
+        self._watcher = FileWatcher(self.text_path, TEXT_FOLLOW_POLL_INTERVAL)
+        self._reopen(from_tail=True)
+        print(f"Following {self.text_path} "
+              f"({'inotify' if self._watcher.using_inotify else 'polling'}), "
+              f"{self.lines_per_page} lines on screen")
+
+    def _reopen(self, from_tail=False):
+        """(Re)open the path - after rotation the new file is read from its start"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        try:
+            self._file = open(self.text_path, 'rb')
+        except FileNotFoundError:
+            self._inode = None
+            return
+        st = os.fstat(self._file.fileno())
+        self._inode = st.st_ino
+        self._offset = max(st.st_size - TEXT_FOLLOW_TAIL_BYTES, 0) if from_tail else 0
+        self._partial = b''
+        self._skip_partial = self._offset > 0
+
+    def _read_appended(self):
+        """Wrapped rows for lines completed since the last read (None if nothing new)"""
+        try:
+            st = os.stat(self.text_path)
+        except FileNotFoundError:
+            # Rotated away and not recreated yet - keep showing what we have
+            return None
+
+        if st.st_ino != self._inode:
+            print(f"{self.text_path} was rotated - following the new file")
+            self._reopen()
+            self._restart_tail()
+        elif st.st_size < self._offset:
+            print(f"{self.text_path} was truncated - following from the start")
+            self._offset = 0
+            self._partial = b''
+            self._restart_tail()
+        if self._file is None or st.st_size == self._offset:
+            return None
+
+        # A burst larger than a screenful only needs its tail
+        if st.st_size - self._offset > TEXT_FOLLOW_TAIL_BYTES:
+            self._offset = st.st_size - TEXT_FOLLOW_TAIL_BYTES
+            self._partial = b''
+            self._skip_partial = True
+        self._file.seek(self._offset)
+        data = self._file.read(st.st_size - self._offset)
+        self._offset += len(data)
+
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        if self._skip_partial and lines:
+            # Started mid-line: the first piece is not a whole line
+            lines.pop(0)
+            self._skip_partial = False
+
+        rows = []
+        for raw in lines:
+            rows.extend(self.wrap_line(raw.decode('utf-8', errors='ignore').rstrip('\r')))
+        self._lines_seen += len(lines)
+        return rows
+
+    def _restart_tail(self):
+        self._tail.clear()
+        self._lines_seen = 0
+        self._follow_redraw = True
+
+    def _draw_follow(self, rows):
+        """Scroll the text area up and draw only the new rows at the bottom"""
+        ch = self.atlas.cell_height
+        text = self.frame[MARGIN:MARGIN + self.lines_per_page * ch]
+        shown = len(self._tail)
+        self._tail.extend(rows)
+
+        if self._follow_redraw or len(rows) >= self.lines_per_page:
+            self.atlas.fill(self.frame)
+            self.atlas.draw_lines(self.frame, list(self._tail), MARGIN, MARGIN)
+            self._follow_redraw = False
+        elif rows:
+            scroll = max(shown + len(rows) - self.lines_per_page, 0)
+            if scroll:
+                text[:-scroll * ch] = text[scroll * ch:]
+            first = shown - scroll
+            band = self.frame[MARGIN + first * ch:MARGIN + (first + len(rows)) * ch]
+            self.atlas.fill(band)
+            self.atlas.draw_lines(self.frame, rows, MARGIN, MARGIN + first * ch)
+
+        # Status line
+        footer_y = self.display_height - 2 * MARGIN
+        self.atlas.fill(self.frame[footer_y:footer_y + ch])
+        self.atlas.draw_text(self.frame, f"Following: {self._lines_seen} new lines", MARGIN,
+                             footer_y, fg=PAGE_INFO_COLOR)
+
+    def _next_follow_frame(self):
+        """Updated tail view, or None when the file has not grown
+
+        The returned duration caps the refresh rate: appends that arrive
+        within it are batched into the next frame.
+        """
+        interval = 1000.0 / TEXT_FOLLOW_MAX_FPS
+        if not self._follow_redraw:
+            self._watcher.wait(TEXT_FOLLOW_POLL_INTERVAL)
+        rows = self._read_appended()
+        if rows is None and not self._follow_redraw:
+            return None, interval
+        self._draw_follow(rows or [])
+        return self.frame, interval
+
+    def cleanup(self):
+        if self._watcher:
+            self._watcher.close()
+        if self._prefetch_thread:
+            self._prefetch_thread.join(timeout=2.0)
+        with self._lock:
+            self._pages.clear()
+            if self._file:
+                self._file.close()
+                self._file = None
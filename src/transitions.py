@@ -0,0 +1,164 @@
+import os
+import sys
+import time
+import numpy as np
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import TRANSITION_STYLE, TRANSITION_DURATION, TRANSITION_MIN_STEPS, TRANSITION_MAX_FPS
+
+TRANSITION_STYLES = ('crossfade', 'wipe', 'slide', 'dissolve')
+
+# Dissolve reveals the new frame in square blocks of this many pixels
+DISSOLVE_BLOCK = 4
+
+class Transitions:
+    """Animated switches between full frames, computed in the RGB565 domain
+
+    Transitions start from whatever the panel shows (the driver's shadow
+    framebuffer) and end on exactly the new frame. Each step's progress
+    comes from the clock, so a slow device draws fewer steps within
+    `duration` rather than taking longer (and a fast one no more than
+    TRANSITION_MAX_FPS). A style whose steps are too
+    slow to fit TRANSITION_MIN_STEPS in the budget falls back to a wipe,
+    which sends every pixel only once.
+
+      crossfade  per-channel fixed-point blend (weights out of 256)
+      dissolve   the new frame appears block by block in random order
+      wipe       the new frame is revealed from left to right
+      slide      the new frame slides in from the right over the old one
+    Wipes and slides send only the columns that change, as windowed writes.
+    """
+
+    def __init__(self, display, style=TRANSITION_STYLE, duration=TRANSITION_DURATION):
+        if style is not None and style not in TRANSITION_STYLES:
+            raise ValueError(f"Unknown transition: {style}")
+        self.display = display
+        self.style = style
+        self.duration = duration
+        self.width = display.width
+        self.height = display.height
+        self.step_cost = {}  # Seconds per step, by style, from the last run
+
+        shape = (self.height, self.width)
+        self._old = np.empty((3,) + shape, dtype=np.int16)
+        self._new = np.empty((3,) + shape, dtype=np.int16)
+        self._mix = np.empty((3,) + shape, dtype=np.int16)
+        self._packed = np.empty(shape, dtype=np.uint16)
+        self._shifted = np.empty(shape, dtype=np.uint16)
+        self._out = np.empty(shape, dtype='>u2')
+        self._mask = np.empty(shape, dtype=bool)
+        self._noise = None
+
+    def run(self, new_frame, on_first_step=None):
+        """Animate from the panel's contents to new_frame; returns the number of steps drawn
+
+        on_first_step is called once the first step is on the panel.
+        """
+        new = np.frombuffer(memoryview(new_frame).cast('B'), dtype='>u2')
+        old = self.display.current_frame()
+        if self.style is None or old is None or new.size != self.width * self.height:
+            self.display.display_image(new_frame)
+            if on_first_step:
+                on_first_step()
+            return 0
+        new = new.reshape(self.height, self.width)
+        old = old.view('>u2').reshape(self.height, self.width)
+
+        style = self.style
+        cost = self.step_cost.get(style)
+        if cost and cost * TRANSITION_MIN_STEPS > self.duration:
+            style = 'wipe'
+        self._prepare(style, old, new)
+
+        start = time.monotonic()
+        steps = 0
+        progress = 0.0
+        while progress < 1.0:
+            step_start = time.monotonic()
+            # Aim each step at the moment it will be on screen
+            estimate = self.step_cost.get(style, 0.0)
+            progress = min((step_start - start + estimate) / self.duration, 1.0)
+            self._draw(style, progress, new)
+            cost = time.monotonic() - step_start
+            self.step_cost[style] = cost
+            steps += 1
+            if steps == 1 and on_first_step:
+                on_first_step()
+
+            if style != 'wipe' and progress < 1.0 and cost * TRANSITION_MIN_STEPS > self.duration:
+                # Too slow for this device - finish the remaining time as a wipe
+                print(f"Transition '{style}' takes {cost * 1000:.0f} ms per step - using wipe")
+                style = 'wipe'
+                self._prepare(style, old, new)
+            elif progress < 1.0:
+                time.sleep(max(step_start + 1.0 / TRANSITION_MAX_FPS - time.monotonic(), 0))
+        return steps
+
+    # ---- per-style setup and drawing ----
+
+    def _prepare(self, style, old, new):
+        if style == 'crossfade':
+            self._unpack(old, self._old)
+            self._unpack(new, self._new)
+        elif style == 'dissolve':
+            if self._noise is None:
+                # One random rank per block, scaled up to pixels
+                rows = -(-self.height // DISSOLVE_BLOCK)
+                cols = -(-self.width // DISSOLVE_BLOCK)
+                blocks = np.random.default_rng().integers(0, 65536, (rows, cols), dtype=np.uint32)
+                self._noise = np.repeat(np.repeat(blocks, DISSOLVE_BLOCK, axis=0), DISSOLVE_BLOCK,
+                                        axis=1)[:self.height, :self.width]
+            np.copyto(self._out, old)
+        elif style == 'wipe':
+            self._edge = 0
+
+    def _draw(self, style, progress, new):
+        if style == 'crossfade':
+            self._crossfade(progress)
+        elif style == 'dissolve':
+            np.less(self._noise, int(progress * 65536), out=self._mask)
+            np.copyto(self._out, new, where=self._mask)
+            self.display.display_image(self._out)
+        elif style == 'wipe':
+            x = round(progress * self.width)
+            if x > self._edge:
+                self.display.write_region(self._edge, 0, x - 1, self.height - 1,
+                                          new[:, self._edge:x].view(np.uint16))
+                self._edge = x
+        elif style == 'slide':
+            x = round(progress * self.width)
+            if x > 0:
+                self.display.write_region(self.width - x, 0, self.width - 1, self.height - 1,
+                                          new[:, :x].view(np.uint16))
+
+    def _crossfade(self, progress):
+        """old + (new - old) * weight / 256 per channel, repacked into the output frame"""
+        weight = int(progress * 256)
+        mix = self._mix
+        np.subtract(self._new, self._old, out=mix)
+        mix *= weight
+        mix >>= 8
+        mix += self._old
+
+        # Channels are non-negative, so the int16 bits are the uint16 values
+        channels = mix.view(np.uint16)
+        np.left_shift(channels[0], 11, out=self._packed)
+        np.left_shift(channels[1], 5, out=self._shifted)
+        self._packed |= self._shifted
+        self._packed |= channels[2]
+        np.copyto(self._out, self._packed)
+        self.display.display_image(self._out)
+
+    @staticmethod
+    def _unpack(frame, planes):
+        """Split big-endian RGB565 into 5/6/5-bit R, G, B planes"""
+        values = frame.astype(np.uint16)
+        np.right_shift(values, 11, out=planes[0], casting='unsafe')
+        np.right_shift(values, 5, out=planes[1], casting='unsafe')
+        planes[1] &= 0x3F
+        np.bitwise_and(values, 0x1F, out=planes[2], casting='unsafe')
@@ -2,15 +2,32 @@ import cv2
 import numpy as np
 import time
 import os
+import sys
+
+# Add config directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+config_path = os.path.join(parent_dir, 'config')
+sys.path.insert(0, config_path)
+
+from display_config import VIDEO_RESIZE_BACKEND, VIDEO_DECODE_WORKERS, VIDEO_RING_SLOTS, VIDEO_SEGMENT_FRAMES
+from rgb565 import RGB565Converter
+from metrics import metrics
 
 class VideoHandler:
-    def __init__(self, video_path, display_width=320, display_height=240):
+    def __init__(self, video_path, display_width=320, display_height=240, workers=VIDEO_DECODE_WORKERS):
         self.video_path = video_path
         self.display_width = display_width
         self.display_height = display_height
         self.cap = None
         self.fps = 0
         self.frame_count = 0
+        self.workers = workers
+        self.pool = None
+        self._lag = 0  # Frames skipped but not yet dropped from the pool ring
+        self._capture = None  # Reused decode buffer
+        self.converter = RGB565Converter(display_width, display_height, channel_order='bgr',
+                                         resize=VIDEO_RESIZE_BACKEND, buffers=2)
         self.load_video()
     
     def load_video(self):
@@ -28,49 +45,76 @@ class VideoHandler:
             print(f"FPS: {self.fps}, Frames: {self.frame_count}")
             print(f"Target display: {self.display_width}x{self.display_height}")
             
+            if self.workers > 0:
+                # Decode in worker processes; this process only reads the shared ring
+                from video_worker import VideoDecodePool
+                self.pool = VideoDecodePool(self.video_path, self.display_width, self.display_height,
+                                            self.fps, self.frame_count, workers=self.workers,
+                                            slots=VIDEO_RING_SLOTS, segment_frames=VIDEO_SEGMENT_FRAMES,
+                                            resize=VIDEO_RESIZE_BACKEND)
+                self.cap.release()
+            
         except Exception as e:
             print(f"Error loading video: {e}")
             raise
     
     def get_next_frame(self):
         """Get next frame as RGB565 data"""
+        if self.pool:
+            # Behind schedule: jump straight to the newest frame already decoded
+            # rather than waiting on the ones skip_frame() dropped
+            start = time.perf_counter()
+            skipped = self.pool.frames_skipped
+            frame, _ = self.pool.next_frame(newest=self._lag > 0, max_skip=self._lag)
+            self._lag -= self.pool.frames_skipped - skipped
+            metrics.observe('decode_wait', time.perf_counter() - start)
+            return (frame, self.frame_duration()) if frame is not None else (None, 100)
+        
         if not self.cap or not self.cap.isOpened():
             return None, 100
         
-        ret, frame = self.cap.read()
+        start = time.perf_counter()
+        ret, frame = self.cap.read(self._capture)
         if not ret:
             # Restart video when finished
             self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, frame = self.cap.read()
+            ret, frame = self.cap.read(self._capture)
             if not ret:
                 return None, 100
+        self._capture = frame
+        metrics.observe('decode', time.perf_counter() - start)
         
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Resize to display dimensions
-        resized_frame = cv2.resize(frame_rgb, (self.display_width, self.display_height))
-        
-        # Convert to RGB565
-        rgb565_data = self.rgb_to_rgb565(resized_frame)
+        # Resize straight from BGR and pack to RGB565 in a reused buffer
+        rgb565_data = self.converter.convert(frame)
         
-        # Calculate frame duration based on video FPS
-        duration = int(1000 / self.fps) if self.fps > 0 else 100
-        
-        return rgb565_data, duration
+        return rgb565_data, self.frame_duration()
     
-    def rgb_to_rgb565(self, image):
-        """Convert RGB image to RGB565 byte array"""
-        r = (image[:,:,0] >> 3) & 0x1F
-        g = (image[:,:,1] >> 2) & 0x3F
-        b = (image[:,:,2] >> 3) & 0x1F
-        
-        rgb565 = ((r << 11) | (g << 5) | b).astype(np.uint16)
-        rgb565_bytes = rgb565.byteswap().tobytes()
+    def frame_duration(self):
+        """Frame duration in ms based on video FPS (fractional, so 29.97 fps does not drift)"""
+        return 1000.0 / self.fps if self.fps > 0 else 100
+    
+    def skip_frame(self):
+        """Skip one frame with grab() - no decode, conversion or resize"""
+        if self.pool:
+            # Dropped when the next frame is fetched, from whatever is decoded by then
+            self._lag = min(self._lag + 1, self.pool.ring.slots)
+            return self.frame_duration()
         
-        return rgb565_bytes
+        if not self.cap or not self.cap.isOpened():
+            return None
+        if not self.cap.grab():
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            if not self.cap.grab():
+                return None
+        return self.frame_duration()
+    
+    def get_frame_count(self):
+        return self.frame_count
     
     def cleanup(self):
         """Release video resources"""
+        if self.pool:
+            self.pool.close()
+            self.pool = None
         if self.cap:
             self.cap.release()
\ No newline at end of file
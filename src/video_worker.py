@@ -0,0 +1,243 @@
+import math
+import multiprocessing
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+from rgb565 import RGB565Converter, _import_cv2
+
+# Shared memory layout:
+#   control   64 bytes      int64 [released_seq, stop]
+#   meta      32 B / slot   seq, valid, pts (ms), published (monotonic s)
+#   frames    ...           RGB565 payloads, one per slot
+CONTROL_BYTES = 64
+META_DTYPE = np.dtype([('seq', '<i8'), ('valid', '<i8'), ('pts', '<f8'), ('published', '<f8')])
+
+class FrameRing:
+    """Ring of ready-to-send RGB565 frames in shared memory
+
+    Frame number n lives in slot n % slots. A writer may only reuse a slot
+    once the reader has released the frame that was in it, and publishes a
+    frame by writing its sequence number after the pixels, so the reader
+    can hand out views into the ring without pickling or copying.
+    """
+
+    def __init__(self, slots, width, height, name=None):
+        self.slots = slots
+        self.width = width
+        self.height = height
+        self.frame_bytes = width * height * 2
+        meta_bytes = slots * META_DTYPE.itemsize
+        size = CONTROL_BYTES + meta_bytes + slots * self.frame_bytes
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            # Workers share the parent's resource tracker, which unlinks on exit
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+
+        buf = self.shm.buf
+        self.control = np.ndarray((2,), dtype='<i8', buffer=buf)
+        self.meta = np.ndarray((slots,), dtype=META_DTYPE, buffer=buf, offset=CONTROL_BYTES)
+        self.frames = np.ndarray((slots, height, width, 2), dtype=np.uint8, buffer=buf,
+                                 offset=CONTROL_BYTES + meta_bytes)
+        if self.owner:
+            self.control[:] = (-1, 0)
+            self.meta['seq'] = -1
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def stopped(self):
+        return bool(self.control[1])
+
+    def stop(self):
+        self.control[1] = 1
+
+    # ---- writer side ----
+
+    def slot_for_write(self, seq):
+        """Wait until frame seq may be written; returns its slot array or None when stopping"""
+        while self.control[0] < seq - self.slots:
+            if self.stopped():
+                return None
+            time.sleep(0.002)
+        slot = seq % self.slots
+        self.meta['seq'][slot] = -1
+        return self.frames[slot]
+
+    def publish(self, seq, pts, valid=True):
+        slot = seq % self.slots
+        self.meta['valid'][slot] = int(valid)
+        self.meta['pts'][slot] = pts
+        self.meta['published'][slot] = time.monotonic()
+        self.meta['seq'][slot] = seq  # Written last: the frame is now visible
+
+    # ---- reader side ----
+
+    def get(self, seq, timeout=1.0):
+        """Wait for frame seq; returns (frame view, valid) or (None, False) on timeout"""
+        slot = seq % self.slots
+        deadline = time.monotonic() + timeout
+        while self.meta['seq'][slot] != seq:
+            if time.monotonic() > deadline:
+                return None, False
+            time.sleep(0.001)
+        return self.frames[slot], bool(self.meta['valid'][slot])
+
+    def newest(self, after):
+        """Highest contiguous published frame number after `after` (or `after` itself)"""
+        seq = after
+        while seq + 1 - after <= self.slots and self.meta['seq'][(seq + 1) % self.slots] == seq + 1:
+            seq += 1
+        return seq
+
+    def release(self, seq):
+        """Frames up to seq are no longer used by the reader"""
+        if seq > self.control[0]:
+            self.control[0] = seq
+
+    def close(self):
+        self.control = self.meta = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a frame view; the mapping goes away with it
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+def _decode_worker(ring_name, slots, width, height, video_path, worker_id, workers,
+                   segment_frames, frame_count, fps, resize):
+    """Worker process: decode, resize and pack frames straight into the ring"""
+    cv2 = _import_cv2()
+    ring = FrameRing(slots, width, height, name=ring_name)
+    cap = cv2.VideoCapture(video_path)
+    converter = RGB565Converter(width, height, channel_order='bgr', resize=resize)
+    frame_ms = 1000.0 / fps if fps > 0 else 100.0
+    capture = None
+
+    def decode_into(seq, position):
+        nonlocal capture
+        out = ring.slot_for_write(seq)
+        if out is None:
+            return False
+        ret, frame = cap.read(capture)
+        if ret:
+            capture = frame
+            converter.convert(frame, out=out)
+        ring.publish(seq, position * frame_ms, valid=ret)
+        return ret
+
+    try:
+        if workers == 1:
+            # Sequential decode, rewinding at the end of the file
+            seq = 0
+            position = 0
+            while not ring.stopped():
+                if not decode_into(seq, position):
+                    if ring.stopped():
+                        break
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    position = 0
+                else:
+                    position += 1
+                seq += 1
+        else:
+            # Interleaved segments: this worker takes every `workers`-th segment
+            segments_per_loop = math.ceil(frame_count / segment_frames)
+            segment = worker_id
+            while not ring.stopped():
+                loop, index = divmod(segment, segments_per_loop)
+                start = index * segment_frames
+                end = min(start + segment_frames, frame_count)
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+                for position in range(start, end):
+                    decode_into(loop * frame_count + position, position)
+                    if ring.stopped():
+                        break
+                segment += workers
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        ring.close()
+
+def ring_slots(slots, workers, segment_frames):
+    """Ring size that lets every worker decode its segment at the same time
+
+    Frame n needs slot n % slots free, so with one segment per worker in
+    flight the ring must span all of them; anything smaller makes each
+    worker wait for the reader to reach its segment, one after another.
+    """
+    if workers <= 1:
+        return slots
+    return workers * segment_frames + slots
+
+class VideoDecodePool:
+    """One or more decode worker processes feeding a shared-memory FrameRing"""
+
+    def __init__(self, video_path, width, height, fps, frame_count, workers=1,
+                 slots=8, segment_frames=48, resize='cv2_area'):
+        if workers > 1 and frame_count <= 0:
+            print("Frame count unknown - using a single decode worker")
+            workers = 1
+        self.workers = workers
+        self.fps = fps
+        self.ring = FrameRing(ring_slots(slots, workers, segment_frames), width, height)
+        self.next_seq = 0
+        self.frames_skipped = 0
+
+        self._processes = []
+        for worker_id in range(workers):
+            process = multiprocessing.Process(
+                target=_decode_worker, name=f'video-decode-{worker_id}', daemon=True,
+                args=(self.ring.name, self.ring.slots, width, height, video_path, worker_id,
+                      workers, segment_frames, frame_count, fps, resize))
+            process.start()
+            self._processes.append(process)
+        print(f"Started {workers} video decode worker(s), {self.ring.slots}-frame ring "
+              f"({self.ring.slots * self.ring.frame_bytes / 1024 / 1024:.1f} MB)")
+
+    def next_frame(self, newest=False, max_skip=None):
+        """Return (frame view, pts ms) for the next frame, or (None, None) on timeout
+
+        With newest=True frames already decoded beyond the next one are
+        skipped (at most max_skip of them, when given) and the most recent
+        is returned instead; frames_skipped counts them.
+        """
+        while True:
+            # The previously returned frame is done with once the caller asks again
+            self.ring.release(self.next_seq - 1)
+            if newest:
+                latest = self.ring.newest(self.next_seq - 1)
+                if max_skip is not None:
+                    latest = min(latest, self.next_seq + max_skip)
+                if latest > self.next_seq:
+                    self.ring.release(latest - 1)
+                    self.frames_skipped += latest - self.next_seq
+                    if max_skip is not None:
+                        max_skip -= latest - self.next_seq
+                    self.next_seq = latest
+            seq = self.next_seq
+            frame, valid = self.ring.get(seq)
+            if frame is None:
+                return None, None
+            self.next_seq += 1
+            if valid:
+                return frame, float(self.ring.meta['pts'][seq % self.ring.slots])
+            self.ring.release(seq)
+
+    def close(self):
+        self.ring.stop()
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        self.ring.close()
@@ -0,0 +1,39 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# Add src and config directories to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, os.path.join(parent_dir, 'src'))
+sys.path.insert(0, os.path.join(parent_dir, 'config'))
+
+from display_config import LANDSCAPE_NORMAL, LANDSCAPE_FLIPPED, LANDSCAPE_BOTH, PORTRAIT_FLIPPED
+from display_output import DualOutput
+
+def console_screen(rotation, hw_scroll, lines=40):
+    """What the simulated panel shows after printing `lines` console lines"""
+    output = DualOutput(rotation=rotation, backend='sim')
+    output.hw_scroll = hw_scroll
+    try:
+        for i in range(lines):
+            output.display_print(f"\nline {i} " + 'x' * (i % 7))
+        return output.display.bus.framebuffer().copy()
+    finally:
+        output.cleanup()
+
+@pytest.mark.parametrize('rotation', [LANDSCAPE_NORMAL, LANDSCAPE_FLIPPED, LANDSCAPE_BOTH])
+def test_hardware_scroll_matches_full_redraw(rotation):
+    output = DualOutput(rotation=rotation, backend='sim')
+    assert output.display.supports_vertical_scroll()
+    output.cleanup()
+    np.testing.assert_array_equal(console_screen(rotation, True), console_screen(rotation, False))
+
+def test_exchanged_rotation_has_no_hardware_scroll():
+    output = DualOutput(rotation=PORTRAIT_FLIPPED, backend='sim')
+    try:
+        assert not output.display.supports_vertical_scroll()
+        assert not output.hw_scroll
+    finally:
+        output.cleanup()
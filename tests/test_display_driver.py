@@ -0,0 +1,85 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# Add src and config directories to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, os.path.join(parent_dir, 'src'))
+sys.path.insert(0, os.path.join(parent_dir, 'config'))
+
+from display_config import LANDSCAPE, LANDSCAPE_NORMAL, DIRTY_RECT_MAX_RECTS
+from display_bus import SimulatedBus
+from display_driver import ILI9341
+
+@pytest.fixture(params=[LANDSCAPE, LANDSCAPE_NORMAL], ids=['exchanged', 'unexchanged'])
+def display(request):
+    display = ILI9341(request.param, bus=SimulatedBus())
+    yield display
+    display.cleanup()
+
+def random_frame(display, seed):
+    """RGB565 frame as (height, width, 2) big-endian bytes"""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (display.height, display.width, 2), dtype=np.uint8)
+
+def assert_shown(display, frame):
+    np.testing.assert_array_equal(display.bus.framebuffer(), frame.view('>u2')[..., 0])
+
+def test_first_frame_is_sent_whole(display):
+    frame = random_frame(display, 0)
+    display.bus.reset_stats()
+    display.display_image(frame)
+    assert_shown(display, frame)
+    assert display.bus.pixel_bytes == frame.nbytes
+
+def test_unchanged_frame_sends_nothing(display):
+    frame = random_frame(display, 0)
+    display.display_image(frame)
+    display.bus.reset_stats()
+    display.display_image(frame.copy())
+    assert display.bus.pixel_bytes == 0
+
+def test_dirty_rect_reproduces_frame(display):
+    frame = random_frame(display, 0)
+    display.display_image(frame)
+    patched = frame.copy()
+    patched[100:132, 140:172] ^= 0xFF
+    display.bus.reset_stats()
+    display.display_image(patched)
+    assert_shown(display, patched)
+    assert display.bus.pixel_bytes == 32 * 32 * 2
+
+def test_scattered_changes_reproduce_frame(display):
+    frame = random_frame(display, 0)
+    display.display_image(frame)
+    rng = np.random.default_rng(1)
+    for step in range(20):
+        patched = frame.copy()
+        # More separate bands than DIRTY_RECT_MAX_RECTS on some steps
+        for _ in range(int(rng.integers(1, 2 * DIRTY_RECT_MAX_RECTS))):
+            y = int(rng.integers(0, display.height))
+            x = int(rng.integers(0, display.width))
+            patched[y:y + 3, x:x + 5] = rng.integers(0, 256, patched[y:y + 3, x:x + 5].shape, dtype=np.uint8)
+        display.display_image(patched)
+        assert_shown(display, patched)
+        frame = patched
+
+def test_large_change_falls_back_to_full_frame(display):
+    display.display_image(random_frame(display, 0))
+    frame = random_frame(display, 1)
+    display.bus.reset_stats()
+    display.display_image(frame)
+    assert_shown(display, frame)
+    assert display.bus.commands.get(0x2C) == 1  # One MEMORYWRITE for the whole frame
+
+def test_fields_reproduce_frame(display):
+    display.display_image(random_frame(display, 0))
+    frame = random_frame(display, 1)
+    display.display_field(frame, 0)
+    display.display_field(frame, 1)
+    assert_shown(display, frame)
+    display.bus.reset_stats()
+    display.display_field(frame, 0)
+    assert display.bus.pixel_bytes == 0
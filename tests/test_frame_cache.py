@@ -0,0 +1,124 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# Add src and config directories to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, os.path.join(parent_dir, 'src'))
+sys.path.insert(0, os.path.join(parent_dir, 'config'))
+
+from frame_cache import FrameCache
+from frame_file import CODEC_ZLIB, FrameFileWriter, MappedFrames
+
+WIDTH, HEIGHT = 32, 24
+FRAME_BYTES = WIDTH * HEIGHT * 2
+
+def make_frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (HEIGHT, WIDTH, 2), dtype=np.uint8) for _ in range(count)]
+
+def make_source(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+@pytest.fixture
+def cache(tmp_path):
+    return FrameCache(str(tmp_path / 'frames'))
+
+def test_store_round_trip(cache, tmp_path):
+    source = make_source(tmp_path, 'a.gif', b'a')
+    key = cache.key(source, WIDTH, HEIGHT)
+    frames = make_frames(5)
+    durations = [0.1, 0.05, 0.2, 0.033, 1.5]
+    stored = cache.store(key, WIDTH, HEIGHT, 0, frames, durations)
+    try:
+        assert len(stored) == len(frames)
+        assert stored.durations == pytest.approx(durations, abs=1e-6)
+        for original, mapped in zip(frames, stored):
+            np.testing.assert_array_equal(mapped, original)
+    finally:
+        stored.close()
+
+def test_miss_and_partial_writer(cache, tmp_path):
+    key = cache.key(make_source(tmp_path, 'a.gif', b'a'), WIDTH, HEIGHT)
+    assert cache.get(key) is None
+    writer = cache.writer(key, WIDTH, HEIGHT)
+    writer.add(make_frames(1)[0], 0.1)
+    # Nothing is published until the writer is closed
+    assert cache.get(key) is None
+    writer.abort()
+    assert cache.get(key) is None
+    assert os.listdir(cache.cache_dir) == []
+
+def test_writer_rejects_wrong_size(cache, tmp_path):
+    key = cache.key(make_source(tmp_path, 'a.gif', b'a'), WIDTH, HEIGHT)
+    with pytest.raises(ValueError):
+        cache.store(key, WIDTH, HEIGHT, 0, [np.zeros(10, dtype=np.uint8)], [0.1])
+    assert cache.get(key) is None
+
+def test_key_depends_on_content_and_settings(cache, tmp_path):
+    a = make_source(tmp_path, 'a.gif', b'a')
+    b = make_source(tmp_path, 'b.gif', b'b')
+    same = make_source(tmp_path, 'copy.gif', b'a')
+    assert cache.key(a, WIDTH, HEIGHT) == cache.key(same, WIDTH, HEIGHT)
+    assert cache.key(a, WIDTH, HEIGHT) != cache.key(b, WIDTH, HEIGHT)
+    assert cache.key(a, WIDTH, HEIGHT) != cache.key(a, HEIGHT, WIDTH)
+    assert cache.key(a, WIDTH, HEIGHT, rotation=1) != cache.key(a, WIDTH, HEIGHT)
+    assert cache.key(a, WIDTH, HEIGHT, variant='fit') != cache.key(a, WIDTH, HEIGHT)
+
+def test_compressed_round_trip(tmp_path):
+    path = str(tmp_path / 'z.r565')
+    frames = make_frames(2) + [np.zeros((HEIGHT, WIDTH, 2), dtype=np.uint8)]
+    writer = FrameFileWriter(path, WIDTH, HEIGHT, codec=CODEC_ZLIB)
+    for frame in frames:
+        writer.add(frame, 0.1)
+    writer.close()
+    mapped = MappedFrames(path)
+    try:
+        # Noise does not shrink and is stored raw; the blank frame is packed
+        assert list(mapped.index['size'][:2]) == [FRAME_BYTES, FRAME_BYTES]
+        assert mapped.index['size'][2] < FRAME_BYTES
+        for original, stored in zip(frames, mapped):
+            np.testing.assert_array_equal(stored, original)
+    finally:
+        mapped.close()
+
+def test_eviction_is_least_recently_used(tmp_path):
+    # Room for two entries of three frames each
+    entry_bytes = 3 * FRAME_BYTES
+    cache = FrameCache(str(tmp_path / 'frames'), max_bytes=int(entry_bytes * 2.5))
+    keys = []
+    for i, name in enumerate(['a.gif', 'b.gif', 'c.gif']):
+        key = cache.key(make_source(tmp_path, name, name.encode()), WIDTH, HEIGHT)
+        if i == 2:
+            # Using the first entry makes the second the oldest
+            hit = cache.get(keys[0])
+            hit.close()
+        stored = cache.store(key, WIDTH, HEIGHT, 0, make_frames(3, seed=i), [0.1] * 3)
+        stored.close()
+        keys.append(key)
+        # Keep mtimes distinct on filesystems with coarse timestamps
+        for age, (_, _, path) in enumerate(reversed(cache.entries())):
+            os.utime(path, (1000 - age, 1000 - age))
+
+    assert cache.get(keys[1]) is None
+    for key in (keys[0], keys[2]):
+        frames = cache.get(key)
+        assert frames is not None
+        frames.close()
+    assert sum(size for _, size, _ in cache.entries()) <= cache.max_bytes
+
+def test_eviction_keeps_the_new_entry(tmp_path):
+    cache = FrameCache(str(tmp_path / 'frames'), max_bytes=FRAME_BYTES)
+    old = cache.key(make_source(tmp_path, 'a.gif', b'a'), WIDTH, HEIGHT)
+    new = cache.key(make_source(tmp_path, 'b.gif', b'b'), WIDTH, HEIGHT)
+    cache.store(old, WIDTH, HEIGHT, 0, make_frames(2), [0.1] * 2).close()
+    # The new entry alone is over the limit, but it is the one being played
+    stored = cache.store(new, WIDTH, HEIGHT, 0, make_frames(2, seed=1), [0.1] * 2)
+    assert stored is not None
+    stored.close()
+    assert cache.get(old) is None
+    assert [path for _, _, path in cache.entries()] == [cache.path(new)]
@@ -0,0 +1,98 @@
+import os
+import sys
+import pytest
+
+# Add src and config directories to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, os.path.join(parent_dir, 'src'))
+sys.path.insert(0, os.path.join(parent_dir, 'config'))
+
+import frame_scheduler
+from frame_scheduler import FrameScheduler
+
+class FakeClock:
+    """Stands in for the time module: sleeping just advances the clock"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(frame_scheduler, 'time', clock)
+    return clock
+
+def test_deadlines_do_not_accumulate_error(clock):
+    scheduler = FrameScheduler()
+    for _ in range(10):
+        scheduler.wait()
+        clock.now += 0.004          # Time spent showing the frame
+        scheduler.presented(100)
+    scheduler.wait()
+    # Ten 100 ms frames end exactly 1 s after the start, despite the work
+    assert clock.now == pytest.approx(101.0)
+    assert clock.sleeps == pytest.approx([0.096] * 10)
+    assert scheduler.frames_presented == 10
+    # Lateness is measured after the frame was shown
+    assert scheduler.mean_jitter() == pytest.approx(0.004)
+
+def test_no_sleep_when_late(clock):
+    scheduler = FrameScheduler()
+    scheduler.presented(50)
+    clock.now += 0.08
+    assert scheduler.wait() == pytest.approx(-0.03)
+    assert clock.sleeps == []
+    scheduler.presented(50)
+    assert scheduler.max_jitter() == pytest.approx(0.03)
+
+def test_behind_drops_until_caught_up(clock):
+    scheduler = FrameScheduler()
+    assert not scheduler.behind()   # Nothing shown yet
+    scheduler.presented(40)
+    clock.now += 0.25               # A stall of several frames
+
+    dropped = 0
+    while scheduler.behind():
+        scheduler.drop(40)
+        dropped += 1
+    # 250 ms late: skip frames until less than one interval behind
+    assert dropped == 5
+    assert scheduler.frames_dropped == 5
+    assert scheduler.wait() == pytest.approx(-0.01)
+    assert scheduler.resyncs == 0
+
+def test_one_interval_late_is_not_behind(clock):
+    scheduler = FrameScheduler()
+    scheduler.presented(40)
+    clock.now += 0.079              # Due at 40 ms, only 39 ms late
+    assert not scheduler.behind()
+
+def test_resync_when_too_far_behind(clock):
+    scheduler = FrameScheduler(max_catchup=0.5)
+    scheduler.presented(40)
+    clock.now += 2.0
+    assert not scheduler.behind()
+    assert scheduler.resyncs == 1
+    assert scheduler.frames_dropped == 0
+    # The timeline restarts at now: the next frame is due immediately
+    assert scheduler.wait() == pytest.approx(0.0)
+    scheduler.presented(40)
+    assert scheduler.wait() == pytest.approx(0.04)
+
+def test_reset_after_pause(clock):
+    scheduler = FrameScheduler()
+    scheduler.presented(100)
+    clock.now += 5.0                # Static content was held
+    scheduler.reset()
+    assert not scheduler.behind()
+    assert scheduler.wait() == pytest.approx(0.0)
+    assert scheduler.resyncs == 0
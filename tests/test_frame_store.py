@@ -0,0 +1,93 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# Add src and config directories to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, os.path.join(parent_dir, 'src'))
+sys.path.insert(0, os.path.join(parent_dir, 'config'))
+
+from frame_store import FrameStore, REF, RAW, RLE, DELTA
+
+WIDTH, HEIGHT = 40, 30
+
+def noise(seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (HEIGHT, WIDTH, 2), dtype=np.uint8)
+
+def bands(value):
+    """Horizontal bands of flat colour: a handful of long runs"""
+    frame = np.zeros((HEIGHT, WIDTH, 2), dtype=np.uint8)
+    for i, y in enumerate(range(0, HEIGHT, 10)):
+        frame[y:y + 10] = (value + i) & 0xFF
+    return frame
+
+def patched(frame, seed, x=5, y=5, size=4):
+    frame = frame.copy()
+    frame[y:y + size, x:x + size] = noise(seed)[:size, :size]
+    return frame
+
+def kinds(store):
+    return [entry[0] for entry in store._entries]
+
+def assert_frames(store, frames, order):
+    for i in order:
+        np.testing.assert_array_equal(store[i], frames[i], err_msg=f"frame {i}")
+
+def test_encodings_round_trip():
+    base = noise(0)
+    frames = [
+        base,                   # RAW: noise does not compress
+        patched(base, 1),       # DELTA: a small patch changed
+        bands(10),              # RLE: everything changed, but in long runs
+        base,                   # REF: same as frame 0
+        patched(base, 2),       # DELTA from the referenced frame
+        patched(base, 2, x=30), # DELTA with two separate spans per row
+    ]
+    store = FrameStore(WIDTH, HEIGHT)
+    for frame in frames:
+        store.append(frame)
+
+    assert kinds(store) == [RAW, DELTA, RLE, REF, DELTA, DELTA]
+    assert len(store) == len(frames)
+    assert_frames(store, frames, range(len(frames)))
+    assert_frames(store, frames, [5, 0, 2, 4, 1, 3, 5, 1])
+    np.testing.assert_array_equal(store[-1], frames[-1])
+    assert store.compression_ratio() > 2
+
+def test_random_access_past_keyframes():
+    interval = 4
+    frames = [noise(0)]
+    for i in range(1, 20):
+        frames.append(patched(frames[-1], i, x=i, y=i % 20))
+    store = FrameStore(WIDTH, HEIGHT, keyframe_interval=interval)
+    for frame in frames:
+        store.append(frame)
+
+    # A keyframe is forced after every `interval` deltas
+    assert kinds(store) == ([RAW] + [DELTA] * interval) * 4
+    order = np.random.default_rng(1).permutation(len(frames))
+    assert_frames(store, frames, order)
+    assert_frames(store, frames, reversed(range(len(frames))))
+    assert [frame.tobytes() for frame in store] == [frame.tobytes() for frame in frames]
+
+def test_lookup_reuses_one_buffer():
+    store = FrameStore(WIDTH, HEIGHT)
+    store.append(noise(0))
+    store.append(noise(1))
+    first = store[0]
+    second = store[1]
+    assert np.shares_memory(first, second)
+    np.testing.assert_array_equal(first, noise(1))
+
+def test_rejects_bad_frames():
+    store = FrameStore(WIDTH, HEIGHT)
+    with pytest.raises(ValueError):
+        store.append(np.zeros((HEIGHT, WIDTH - 1, 2), dtype=np.uint8))
+    store.append(noise(0))
+    with pytest.raises(IndexError):
+        store[1]
+    with pytest.raises(IndexError):
+        store[-2]
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import numpy as np
+import pytest
+
+# Add src and config directories to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, os.path.join(parent_dir, 'src'))
+sys.path.insert(0, os.path.join(parent_dir, 'config'))
+
+from video_worker import FrameRing, VideoDecodePool, ring_slots
+
+def write_video(path, frames, width=320, height=240):
+    """MJPG file whose frame n is a flat grey of level 4 * n, so order shows in the pixels"""
+    cv2 = pytest.importorskip('cv2')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 25, (width, height))
+    for n in range(frames):
+        writer.write(np.full((height, width, 3), (4 * n) % 256, dtype=np.uint8))
+    writer.release()
+
+def test_ring_lets_every_worker_start_its_segment():
+    workers, segment = 4, 48
+    ring = FrameRing(ring_slots(8, workers, segment), 8, 8)
+    try:
+        ring.stop()  # slot_for_write returns None instead of waiting when it would block
+        for worker in range(workers):
+            # Nothing released yet: the first frame of each worker's segment is still writable
+            assert ring.slot_for_write(worker * segment) is not None
+        assert ring.slot_for_write(ring.slots) is None
+    finally:
+        ring.close()
+
+def test_ring_publish_and_release_order():
+    ring = FrameRing(4, 8, 8)
+    try:
+        for seq in (1, 0, 2):
+            ring.slot_for_write(seq)[:] = seq
+            ring.publish(seq, seq * 40.0)
+        assert ring.newest(-1) == 2
+        frame, valid = ring.get(1, timeout=0.1)
+        assert valid and frame[0, 0, 0] == 1
+        assert ring.get(3, timeout=0.01) == (None, False)
+
+        ring.stop()
+        assert ring.slot_for_write(4) is None  # Slot 0 still holds unreleased frame 0
+        ring.release(0)
+        assert ring.slot_for_write(4) is not None
+    finally:
+        ring.close()
+
+@pytest.mark.parametrize('workers', [1, 2, 3])
+def test_pool_delivers_frames_in_order(tmp_path, workers):
+    path = str(tmp_path / 'order.avi')
+    write_video(path, 30)
+    pool = VideoDecodePool(path, 320, 240, 25, 30, workers=workers, slots=4, segment_frames=8)
+    try:
+        for n in range(75):  # Two and a half passes, across segment and loop boundaries
+            frame, pts = pool.next_frame()
+            assert frame is not None, f"frame {n} timed out"
+            assert pts == pytest.approx((n % 30) * 40.0)
+            level = int(frame[120, 160].view('>u2')[0]) >> 11  # Red channel, 5 bits
+            assert abs(level - ((4 * (n % 30)) >> 3)) <= 1
+    finally:
+        pool.close()
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason='needs more than one CPU')
+def test_two_workers_decode_faster_than_one(tmp_path):
+    path = str(tmp_path / 'speed.avi')
+    write_video(path, 192, 1280, 720)
+
+    def frames_per_second(workers):
+        pool = VideoDecodePool(path, 320, 240, 25, 192, workers=workers)
+        try:
+            pool.next_frame()  # Workers started and warmed up
+            start = time.perf_counter()
+            for _ in range(150):
+                assert pool.next_frame()[0] is not None
+            return 150 / (time.perf_counter() - start)
+        finally:
+            pool.close()
+
+    one = frames_per_second(1)
+    two = frames_per_second(2)
+    assert two > one * 1.3, f"1 worker: {one:.0f} fps, 2 workers: {two:.0f} fps"
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import time
+
+# Add all necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, 'src')
+config_dir = os.path.join(current_dir, 'config')
+
+sys.path.insert(0, src_dir)
+sys.path.insert(0, config_dir)
+
+from display_config import PORTRAIT
+from display_output import init_output
+from file_dispatcher import FileDispatcher
+from frame_file import FrameFileWriter, CODEC_RAW, CODEC_ZLIB
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Pre-render a GIF, video, image or text file into a native .r565 frame file')
+    parser.add_argument('input', help='Source file')
+    parser.add_argument('output', nargs='?', default=None,
+                        help='Output .r565 file (default: input name with .r565)')
+    parser.add_argument('--width', type=int, default=320, help='Display width in pixels')
+    parser.add_argument('--height', type=int, default=240, help='Display height in pixels')
+    parser.add_argument('--rotation', type=lambda v: int(v, 0), default=PORTRAIT,
+                        help='MADCTL rotation value the file is rendered for')
+    parser.add_argument('--frames', type=int, default=None,
+                        help='Number of frames to render (default: one full loop)')
+    parser.add_argument('--compress', action='store_true',
+                        help='zlib-compress frames (smaller files, a little CPU at playback)')
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.splitext(args.input)[0] + '.r565'
+
+    # Keep handler progress messages off the panel
+    init_output(backend='sim')
+
+    dispatcher = FileDispatcher(args.input, args.width, args.height, args.rotation)
+    if not dispatcher.is_supported() or dispatcher.get_file_type() == 'native':
+        print(f"Cannot transcode {args.input}")
+        sys.exit(1)
+
+    frame_count = args.frames
+    if frame_count is None:
+        if dispatcher.get_file_type() == 'image':
+            frame_count = 1
+        else:
+            frame_count = dispatcher.handler.get_frame_count()
+    if frame_count <= 0:
+        print("Source length is unknown - pass --frames")
+        sys.exit(1)
+
+    codec = CODEC_ZLIB if args.compress else CODEC_RAW
+    writer = FrameFileWriter(output_path, args.width, args.height, args.rotation, codec)
+    start = time.monotonic()
+    try:
+        for i in range(frame_count):
+            frame_data, duration = dispatcher.get_next_frame()
+            if frame_data is None:
+                break
+            writer.add(frame_data, duration)
+            if (i + 1) % 50 == 0:
+                print(f"Rendered {i + 1}/{frame_count} frames")
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        dispatcher.cleanup()
+
+    size = os.path.getsize(output_path)
+    print(f"Wrote {len(writer)} frames to {output_path} "
+          f"({size / 1024 / 1024:.1f} MB) in {time.monotonic() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
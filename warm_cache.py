@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+
+# Add all necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, 'src')
+config_dir = os.path.join(current_dir, 'config')
+
+sys.path.insert(0, src_dir)
+sys.path.insert(0, config_dir)
+
+from display_config import PORTRAIT
+from display_output import init_output
+from file_dispatcher import FileDispatcher, detect_file_type
+from frame_cache import FrameCache
+
+# Content types that go through the frame cache
+CACHED_TYPES = ('gif', 'image')
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-convert GIFs and images into the frame cache')
+    parser.add_argument('paths', nargs='*', default=[os.path.join(current_dir, 'assets')],
+                        help='Files or directories to warm (default: assets/)')
+    parser.add_argument('--width', type=int, default=320, help='Display width in pixels')
+    parser.add_argument('--height', type=int, default=240, help='Display height in pixels')
+    parser.add_argument('--rotation', type=lambda v: int(v, 0), default=PORTRAIT,
+                        help='MADCTL rotation value the cache entries are keyed on')
+    args = parser.parse_args()
+
+    # Keep handler progress messages off the panel
+    init_output(backend='sim')
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names))
+        else:
+            files.append(path)
+
+    warmed = 0
+    for path in files:
+        if detect_file_type(path) not in CACHED_TYPES:
+            continue
+        print(f"Warming {path}")
+        dispatcher = FileDispatcher(path, args.width, args.height, args.rotation)
+        handler = dispatcher.handler
+        if getattr(handler, 'streaming', False):
+            # Streamed GIFs are only written to the cache as their first pass plays
+            handler.finish_first_pass()
+        if dispatcher.is_supported() and handler.is_cached():
+            warmed += 1
+        else:
+            print(f"Not cached: {path}")
+        dispatcher.cleanup()
+
+    cache = FrameCache()
+    total = sum(size for _, size, _ in cache.entries())
+    print(f"Warmed {warmed} files; cache holds {total / 1024 / 1024:.1f} MB in {cache.cache_dir}")
+
+if __name__ == "__main__":
+    main()